@@ -0,0 +1,244 @@
+"""게임 엔진 성능 측정 도구 (격자 구조 계산, 승리 판정, 무작위 대국).
+
+예) python benchmark.py --output bench.json
+    python benchmark.py --baseline bench.json --tolerance 0.15
+
+격자 크기 N을 2부터 200까지 바꿔 가며 측정하고, 항목마다 초당 실행 횟수(ops/sec)와
+한 번 실행할 때의 최대 메모리(tracemalloc)를 JSON으로 기록합니다.
+--baseline을 주면 저장해 둔 결과와 비교해, tolerance보다 느려진 항목이 있으면 종료 코드 1을 반환합니다.
+난수 시드가 고정되어 있어 같은 설정이면 같은 보드와 같은 대국으로 측정합니다.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from hexengine import (
+    TOTAL_PARTS_PER_HEX, WINNING_TYPE_OPTIONS, DEFAULT_PLAYERS, DEFAULT_WINNING_LENGTH,
+    MIN_GRID_SIZE, MAX_GRID_SIZE, EMPTY, WIN_TYPE_ALIASES, GameState, HexBoard,
+    build_vertex_to_parts_map, build_adjacency_list, check_win_adjacency, check_draw, calculate_available_moves,
+)
+
+DEFAULT_SIZES = [2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64, 128, 200]
+DEFAULT_MIN_TIME = 0.2  # 한 번의 측정에 쓰는 최소 시간 (초)
+DEFAULT_REPEAT = 3  # 측정 횟수 (가장 빠른 값을 사용)
+DEFAULT_TOLERANCE = 0.15  # 기준보다 이 비율 이상 느려지면 성능 저하로 봄
+BENCH_SEED = 12345
+DENSE_BOARD_COUNT = 8  # 승리 판정 측정에 돌려 쓰는 꽉 찬 보드 수
+BENCH_NAMES = ['vertex_map', 'adjacency', 'check_win_dense', 'check_draw', 'available_moves', 'playout']
+
+
+def dense_board(total_spots, num_players, rng):
+    """모든 칸이 무작위 플레이어 돌로 찬 보드."""
+    return [DEFAULT_PLAYERS[rng.randrange(num_players)] for _ in range(total_spots)]
+
+
+def bench_cases(grid_size, names, win_types):
+    """(이름, 격자 크기, 승리 타입, 한 번 실행할 함수) 목록. 준비 작업은 여기서 끝냅니다."""
+    rng = random.Random(BENCH_SEED + grid_size)
+    total_spots = grid_size * grid_size * TOTAL_PARTS_PER_HEX
+    vertex_to_parts_map = build_vertex_to_parts_map(grid_size, grid_size)
+    cases = []
+    if 'vertex_map' in names:
+        cases.append(('vertex_map', None, lambda: build_vertex_to_parts_map(grid_size, grid_size)))
+    if 'adjacency' in names:
+        for win_type in win_types:
+            cases.append(('adjacency', win_type,
+                          lambda win_type=win_type: build_adjacency_list(win_type, vertex_to_parts_map, total_spots)))
+    if 'check_win_dense' in names:
+        boards = [dense_board(total_spots, 2, rng) for _ in range(DENSE_BOARD_COUNT)]
+        for win_type in win_types:
+            adjacency = build_adjacency_list(win_type, vertex_to_parts_map, total_spots)
+            starts = [rng.randrange(total_spots) for _ in boards]
+            state = {'i': 0}
+
+            def check_win(adjacency=adjacency, starts=starts, state=state):
+                i = state['i'] = (state['i'] + 1) % len(boards)
+                return check_win_adjacency(boards[i], adjacency, total_spots, starts[i])
+            cases.append(('check_win_dense', win_type, check_win))
+    if 'check_draw' in names or 'available_moves' in names:
+        # 마지막 칸 하나만 빈 보드 (처음부터 끝까지 훑어야 하는 경우)
+        almost_full = dense_board(total_spots, len(DEFAULT_PLAYERS), rng)
+        almost_full[-1] = EMPTY
+        if 'check_draw' in names:
+            cases.append(('check_draw', None, lambda: check_draw(almost_full)))
+        if 'available_moves' in names:
+            cases.append(('available_moves', None, lambda: calculate_available_moves(almost_full)))
+    if 'playout' in names and MIN_GRID_SIZE <= grid_size <= MAX_GRID_SIZE:
+        hex_board = HexBoard(grid_size)
+        for win_type in win_types:
+            playout_rng = random.Random(BENCH_SEED)
+
+            def playout(win_type=win_type, playout_rng=playout_rng):
+                game = GameState(grid_size, len(DEFAULT_PLAYERS), DEFAULT_WINNING_LENGTH, win_type, hex_board=hex_board)
+                # 무작위 순서를 한 번에 정해 두고 둡니다. (큰 판에서 매 수 빈 칸 목록을 만드는 비용은 빼고 착수만 측정)
+                order = list(range(game.total_spots))
+                playout_rng.shuffle(order)
+                for flat_index in order:
+                    game.play(flat_index)
+                    if not game.game_active: break
+                return game.winner
+            cases.append(('playout', win_type, playout))
+    return cases
+
+
+def measure(func, min_time, repeat):
+    """가장 빠른 측정의 (초당 실행 횟수, 측정한 실행 횟수)."""
+    func()  # 준비 (캐시 등)
+    best = None
+    for _ in range(repeat):
+        iterations = 0
+        started = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            func()
+            iterations += 1
+            elapsed = time.perf_counter() - started
+        rate = iterations / elapsed
+        if best is None or rate > best[0]:
+            best = (rate, iterations)
+    return best
+
+
+def peak_memory(func):
+    """func 한 번 실행하는 동안의 최대 추가 메모리 (바이트)."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(sizes, names, win_types, min_time, repeat, progress=None):
+    results = []
+    for grid_size in sizes:
+        for name, win_type, func in bench_cases(grid_size, names, win_types):
+            ops_per_sec, iterations = measure(func, min_time, repeat)
+            result = {
+                'name': name,
+                'grid_size': grid_size,
+                'win_type': win_type,
+                'ops_per_sec': round(ops_per_sec, 3),
+                'seconds_per_op': round(1.0 / ops_per_sec, 9),
+                'iterations': iterations,
+                'peak_bytes': peak_memory(func),
+            }
+            results.append(result)
+            if progress is not None: progress(result)
+    return results
+
+
+def result_key(result):
+    return result['name'], result['grid_size'], result['win_type']
+
+
+def compare(results, baseline_results, tolerance):
+    """기준 결과와 비교해 항목별 비교 목록과 성능 저하 여부를 반환합니다."""
+    baseline = {result_key(r): r for r in baseline_results}
+    comparisons = []
+    regressed = False
+    for result in results:
+        base = baseline.get(result_key(result))
+        if base is None: continue
+        ratio = result['ops_per_sec'] / base['ops_per_sec'] if base['ops_per_sec'] else None
+        is_regression = ratio is not None and ratio < 1.0 - tolerance
+        regressed = regressed or is_regression
+        comparisons.append({
+            'name': result['name'],
+            'grid_size': result['grid_size'],
+            'win_type': result['win_type'],
+            'baseline_ops_per_sec': base['ops_per_sec'],
+            'ops_per_sec': result['ops_per_sec'],
+            'speed_ratio': round(ratio, 4) if ratio is not None else None,
+            'peak_bytes_ratio': round(result['peak_bytes'] / base['peak_bytes'], 4) if base['peak_bytes'] else None,
+            'regression': is_regression,
+        })
+    return comparisons, regressed
+
+
+def parse_sizes(text):
+    """'2,3,8' 또는 '2-64' (범위 안의 모든 크기) 형식."""
+    sizes = []
+    for part in text.split(','):
+        if '-' in part:
+            low, high = part.split('-')
+            sizes.extend(range(int(low), int(high) + 1))
+        else:
+            sizes.append(int(part))
+    return sizes
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="육각형 틱택토 엔진 성능 측정")
+    parser.add_argument('--sizes', type=parse_sizes, default=DEFAULT_SIZES,
+                        help="격자 크기 목록 ('2,3,8' 또는 '2-64', 기본: " + ','.join(map(str, DEFAULT_SIZES)) + ")")
+    parser.add_argument('--only', default=','.join(BENCH_NAMES), help="측정할 항목 (쉼표로 구분): " + '/'.join(BENCH_NAMES))
+    parser.add_argument('--win-types', default='any,edge,vertex', help="승리 조건 목록: any/edge/vertex (쉼표로 구분)")
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME, help="측정 한 번의 최소 시간 (초)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="측정 횟수 (가장 빠른 값 사용)")
+    parser.add_argument('--output', default='-', help="결과 JSON 파일 ('-'는 표준 출력)")
+    parser.add_argument('--baseline', help="비교할 기준 결과 JSON 파일")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="허용하는 속도 저하 비율 (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    args.names = [name.strip() for name in args.only.split(',')]
+    for name in args.names:
+        if name not in BENCH_NAMES: parser.error(f"알 수 없는 측정 항목: {name}")
+    args.win_types = [WIN_TYPE_ALIASES.get(name.strip(), name.strip()) for name in args.win_types.split(',')]
+    for win_type in args.win_types:
+        if win_type not in WINNING_TYPE_OPTIONS: parser.error("잘못된 승리 타입")
+    if any(size < 1 for size in args.sizes): parser.error("격자 크기는 1 이상")
+    if args.min_time <= 0 or args.repeat < 1: parser.error("min-time은 0보다 크고 repeat은 1 이상")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    def progress(result):
+        print(f"{result['name']:<16} N={result['grid_size']:<3} {result['win_type'] or '':<8} "
+              f"{result['ops_per_sec']:>14.1f} ops/s {result['peak_bytes']:>12} B", file=sys.stderr)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'sizes': args.sizes,
+            'min_time': args.min_time,
+            'repeat': args.repeat,
+            'seed': BENCH_SEED,
+            'playout_sizes': [n for n in args.sizes if MIN_GRID_SIZE <= n <= MAX_GRID_SIZE],
+        },
+        'results': run_benchmarks(args.sizes, args.names, args.win_types, args.min_time, args.repeat, progress),
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparisons, regressed = compare(report['results'], baseline['results'], args.tolerance)
+        report['comparison'] = {'baseline': args.baseline, 'tolerance': args.tolerance,
+                                'regressed': regressed, 'items': comparisons}
+        for item in comparisons:
+            if item['regression']:
+                print(f"느려짐: {item['name']} N={item['grid_size']} {item['win_type'] or ''} "
+                      f"{item['baseline_ops_per_sec']} -> {item['ops_per_sec']} ops/s (x{item['speed_ratio']})", file=sys.stderr)
+        if regressed: exit_code = 1
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""클릭 판정 회귀 검사: pixel_to_flat(축 좌표 계산)을 부분 도형 polygon 안/밖 판정과 비교합니다.
+
+예) python check_hittest.py
+    python check_hittest.py --sizes 2,3,7 --points 5000 --seed 3
+
+격자마다 판 전체를 감싸는 사각형(여백 포함)에서 무작위 점을 뽑고, 모든 부분 도형 polygon에 대해
+직접 점 포함 판정(반직선 교차)을 해서 얻은 칸(어디에도 없으면 None)과 pixel_to_flat의 결과를 비교합니다.
+두 도형의 경계 위 점은 어느 쪽이든 맞으므로 건너뜁니다. 하나라도 다르면 종료 코드 1을 반환합니다.
+"""
+import argparse
+import math
+import random
+import sys
+
+from hexengine import TOTAL_PARTS_PER_HEX, flat_to_coords
+from hexrender import pixel_to_flat, part_polygon
+
+DEFAULT_SIZES = [2, 3, 4, 5, 6, 7]
+DEFAULT_POINTS = 3000
+DEFAULT_SEED = 7
+HEX_SIZES = [40, 13.7, 3]  # 화면 육각형 크기 (정수가 아닌 크기도 확인)
+BOUNDARY_EPSILON = 1e-7  # 육각형 크기 대비 이만큼 경계에 가까우면 건너뜀
+
+
+def point_in_polygon(x, y, coords):
+    """반직선 교차 판정 (coords = [x0, y0, x1, y1, ...])."""
+    inside = False
+    count = len(coords) // 2
+    for i in range(count):
+        x1, y1 = coords[2 * i], coords[2 * i + 1]
+        x2, y2 = coords[2 * ((i + 1) % count)], coords[2 * ((i + 1) % count) + 1]
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+
+def distance_to_edges(x, y, coords):
+    """점에서 polygon 변까지의 가장 가까운 거리."""
+    best = math.inf
+    count = len(coords) // 2
+    for i in range(count):
+        x1, y1 = coords[2 * i], coords[2 * i + 1]
+        x2, y2 = coords[2 * ((i + 1) % count)], coords[2 * ((i + 1) % count) + 1]
+        dx, dy = x2 - x1, y2 - y1
+        t = max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / (dx * dx + dy * dy)))
+        best = min(best, math.hypot(x - x1 - t * dx, y - y1 - t * dy))
+    return best
+
+
+def check_size(grid_size, points, rng):
+    """grid_size에서 다른 점 설명 목록과 비교한 점 수 (같으면 빈 목록)."""
+    problems = []
+    checked = 0
+    for hex_size in HEX_SIZES:
+        offset_x, offset_y = rng.uniform(0, 2 * hex_size), rng.uniform(0, 2 * hex_size)
+        polygons = [part_polygon(*flat_to_coords(flat_index, grid_size, grid_size), hex_size, offset_x, offset_y)
+                    for flat_index in range(grid_size * grid_size * TOTAL_PARTS_PER_HEX)]  # flat index 순서
+        xs = [value for coords in polygons for value in coords[0::2]]
+        ys = [value for coords in polygons for value in coords[1::2]]
+        for _ in range(points):
+            x = rng.uniform(min(xs) - hex_size, max(xs) + hex_size)
+            y = rng.uniform(min(ys) - hex_size, max(ys) + hex_size)
+            inside = [flat_index for flat_index, coords in enumerate(polygons) if point_in_polygon(x, y, coords)]
+            expected = inside[0] if inside else None
+            actual = pixel_to_flat(x, y, grid_size, grid_size, hex_size, offset_x, offset_y)
+            # 두 결과가 다를 수 있는 곳은 기대한 도형이나 돌려받은 도형의 경계뿐입니다.
+            if any(distance_to_edges(x, y, polygons[flat_index]) < BOUNDARY_EPSILON * hex_size
+                   for flat_index in {expected, actual} if flat_index is not None): continue
+            checked += 1
+            if len(inside) > 1 or actual != expected:
+                problems.append(f"크기 {hex_size} ({x:.3f}, {y:.3f}): 도형 {inside}, pixel_to_flat {actual}")
+    return problems, checked
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="클릭 판정을 polygon 포함 판정과 비교")
+    parser.add_argument('--sizes', type=lambda text: [int(value) for value in text.split(',')], default=DEFAULT_SIZES,
+                        help="격자 크기 목록 (쉼표로 구분)")
+    parser.add_argument('--points', type=int, default=DEFAULT_POINTS, help="격자 크기, 육각형 크기마다 뽑을 점 수")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="난수 시드")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+    failed = False
+    for grid_size in args.sizes:
+        problems, checked = check_size(grid_size, args.points, rng)
+        print(f"N={grid_size}: {checked}점 {'같음' if not problems else '다름 - ' + problems[0]}")
+        failed = failed or bool(problems)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
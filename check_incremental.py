@@ -0,0 +1,103 @@
+"""증분 자료구조 회귀 검사: 착수/지우기/되돌리기/다시 하기를 무작위로 섞어 두면서 매 단계 새로 계산한 값과 비교합니다.
+
+예) python check_incremental.py
+    python check_incremental.py --games 500 --seed 3
+
+ConnectivityTracker(연결 그룹 union-find)는 돌마다 그룹 크기를, ThreatIndex(이기는 칸 색인)는 빈 칸마다
+그 칸에 두었을 때의 그룹 크기를 BFS로 직접 세어 얻은 값과 비교합니다.
+하나라도 다르면 처음 다른 곳을 출력하고 종료 코드 1을 반환합니다.
+"""
+import argparse
+import random
+import sys
+
+from hexengine import WINNING_TYPE_OPTIONS, EMPTY, GameState, iter_bits
+
+DEFAULT_GAMES = 300
+DEFAULT_STEPS = 60
+DEFAULT_SEED = 7
+MAX_CHECK_GRID_SIZE = 5  # 매 단계 모든 빈 칸을 BFS로 세므로 작은 판만 씀
+
+
+def bfs_group_size(board, csr, start, mark):
+    """start를 mark의 돌로 보았을 때 start와 이어진 mark 돌의 수 (CSR 인접 기준)."""
+    offsets, neighbors = csr
+    seen = {start}
+    stack = [start]
+    while stack:
+        cell = stack.pop()
+        for k in range(offsets[cell], offsets[cell + 1]):
+            neighbor = neighbors[k]
+            if neighbor not in seen and board[neighbor] == mark:
+                seen.add(neighbor)
+                stack.append(neighbor)
+    return len(seen)
+
+
+def expected_threats(game):
+    """플레이어별 이기는 칸 목록 (모든 빈 칸을 직접 확인)."""
+    csr = game.hex_board.csr(game.winning_type)
+    empty_cells = [i for i, mark in enumerate(game.board) if mark == EMPTY]
+    return [[cell for cell in empty_cells if bfs_group_size(game.board, csr, cell, player) >= game.min_win_length]
+            for player in game.players]
+
+
+def check_game(game):
+    """지금 상태에서 증분 자료구조가 새로 계산한 값과 다른 항목 설명 목록 (같으면 빈 목록)."""
+    problems = []
+    csr = game.hex_board.csr(game.winning_type)
+    for player in game.players:
+        tracker = game.connectivity[player]
+        # 이 플레이어의 돌이 아닌 칸은 0이어야 합니다. (지운 돌, 되돌린 돌이 남아 있지 않은지)
+        if any(tracker.group_size(cell) != (bfs_group_size(game.board, csr, cell, player) if mark == player else 0)
+               for cell, mark in enumerate(game.board)):
+            problems.append(f"ConnectivityTracker ({player})")
+    if game.game_active:
+        actual = [list(iter_bits(mask)) for mask in game.threats.masks]
+        if actual != expected_threats(game):
+            problems.append("ThreatIndex")
+    return problems
+
+
+def random_step(game, rng):
+    """착수/지우기/되돌리기/다시 하기 중 하나를 무작위로 합니다."""
+    r = rng.random()
+    if r < 0.55 and game.game_active:
+        game.play(rng.choice(game.available_moves()))
+    elif r < 0.65:
+        occupied = [i for i, mark in enumerate(game.board) if mark != EMPTY]
+        if occupied: game.clear(rng.choice(occupied))
+    elif r < 0.85:
+        game.undo()
+    else:
+        game.redo()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="증분 자료구조를 새로 계산한 값과 비교")
+    parser.add_argument('--games', type=int, default=DEFAULT_GAMES, help="무작위 게임 수")
+    parser.add_argument('--steps', type=int, default=DEFAULT_STEPS, help="게임당 단계 수")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="난수 시드")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+    checks = 0
+    for game_index in range(args.games):
+        game = GameState(rng.randint(2, MAX_CHECK_GRID_SIZE), rng.randint(2, 4), rng.randint(3, 6),
+                         rng.choice(WINNING_TYPE_OPTIONS))
+        for step in range(args.steps):
+            random_step(game, rng)
+            problems = check_game(game)
+            if problems:
+                print(f"게임 {game_index} 단계 {step}: 다름 - {', '.join(problems)}")
+                return 1
+            checks += 1
+    print(f"{args.games}게임 {checks}단계: 같음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""격자 구조 회귀 검사: 정수 격자 꼭짓점 맵/CSR 인접 정보를 예전 실수 좌표 방식과 비교합니다.
+
+예) python check_topology.py
+    python check_topology.py --sizes 2,3,4,5,6,7
+
+예전 방식은 화면 좌표(HEX_SIZE 40, 캔버스 여백만큼 옮긴 시작 위치)로 꼭짓점을 계산해 소수 둘째 자리로
+반올림한 값을 키로 쓰고, 인접 리스트는 부분 도형 쌍마다 공유 꼭짓점 수를 세어 만들었습니다.
+꼭짓점 키의 모양은 다르므로 '같은 꼭짓점을 공유하는 부분 도형 묶음'이 같은지 비교하고,
+인접 리스트는 세 승리 타입 모두 칸별로 그대로 비교합니다. 하나라도 다르면 종료 코드 1을 반환합니다.
+"""
+import argparse
+import math
+import sys
+
+from hexengine import (
+    TOTAL_PARTS_PER_HEX, PART_VERTEX_INDICES, WINNING_TYPE_OPTIONS, WINNING_TYPE_ANY_VERTEX,
+    WINNING_TYPE_EDGE_ONLY, WINNING_TYPE_VERTEX_ONLY, coords_to_flat, build_vertex_to_parts_map, build_adjacency_list,
+)
+
+DEFAULT_SIZES = [2, 3, 4, 5, 6, 7]
+LEGACY_HEX_SIZE = 40
+LEGACY_ROUND_PRECISION = 2
+LEGACY_VERTEX_ANGLES = [90, 30, -30, -90, -150, 150]
+
+# ----------------------------------------------------------------------
+# 예전 방식 (실수 좌표 반올림, 부분 도형 쌍 비교)
+# ----------------------------------------------------------------------
+def legacy_start_offset(rows, cols, hex_size=LEGACY_HEX_SIZE):
+    """예전 calculate_canvas_geometry의 시작 위치 (여백 = 육각형 크기)."""
+    min_x_rel, min_y_rel = float('inf'), float('inf')
+    for r_idx in range(rows):
+        for c_idx in range(cols):
+            q = c_idx - math.floor(r_idx / 2)
+            cx_rel = hex_size * math.sqrt(3) * (q + r_idx / 2.0)
+            cy_rel = hex_size * (3.0 / 2.0) * r_idx
+            for angle in LEGACY_VERTEX_ANGLES:
+                min_x_rel = min(min_x_rel, cx_rel + hex_size * math.cos(math.radians(angle)))
+                min_y_rel = min(min_y_rel, cy_rel + hex_size * math.sin(math.radians(angle)))
+    return hex_size - min_x_rel, hex_size - min_y_rel
+
+
+def legacy_vertex_to_parts_map(rows, cols, hex_size=LEGACY_HEX_SIZE):
+    start_x, start_y = legacy_start_offset(rows, cols, hex_size)
+    unit_vertices = [(math.cos(math.radians(a)), math.sin(math.radians(a))) for a in LEGACY_VERTEX_ANGLES] + [(0, 0)]
+    vertex_to_parts_map = {}
+    for row in range(rows):
+        for col in range(cols):
+            q = col - math.floor(row / 2)
+            cx = start_x + hex_size * math.sqrt(3) * (q + row / 2.0)
+            cy = start_y + hex_size * (3.0 / 2.0) * row
+            for part_index in range(TOTAL_PARTS_PER_HEX):
+                flat_index = coords_to_flat(row, col, part_index, rows, cols)
+                for v_idx in PART_VERTEX_INDICES[part_index]:
+                    vx, vy = unit_vertices[v_idx]
+                    key = (round(cx + hex_size * vx, LEGACY_ROUND_PRECISION), round(cy + hex_size * vy, LEGACY_ROUND_PRECISION))
+                    parts = vertex_to_parts_map.setdefault(key, [])
+                    if flat_index not in parts: parts.append(flat_index)
+    return vertex_to_parts_map
+
+
+def legacy_adjacency_list(win_type, vertex_to_parts_map, total_spots):
+    parts_to_vertex_map = {}
+    for vertex, parts in vertex_to_parts_map.items():
+        for flat_index in parts:
+            parts_to_vertex_map.setdefault(flat_index, set()).add(vertex)
+
+    adj_list = [[] for _ in range(total_spots)]
+    for flat_index1 in range(total_spots):
+        if flat_index1 not in parts_to_vertex_map: continue
+        for flat_index2 in range(flat_index1 + 1, total_spots):
+            if flat_index2 not in parts_to_vertex_map: continue
+            shared = len(parts_to_vertex_map[flat_index1] & parts_to_vertex_map[flat_index2])
+            if win_type == WINNING_TYPE_ANY_VERTEX: adjacent = shared >= 1
+            elif win_type == WINNING_TYPE_EDGE_ONLY: adjacent = shared >= 2
+            elif win_type == WINNING_TYPE_VERTEX_ONLY: adjacent = shared == 1
+            else: adjacent = False
+            if adjacent:
+                adj_list[flat_index1].append(flat_index2)
+                adj_list[flat_index2].append(flat_index1)
+    return adj_list
+
+# ----------------------------------------------------------------------
+# 비교
+# ----------------------------------------------------------------------
+def part_groups(vertex_to_parts_map):
+    """꼭짓점 키와 상관없이 비교할 수 있도록 꼭짓점별 부분 도형 묶음의 목록 (정렬)."""
+    return sorted(tuple(sorted(parts)) for parts in vertex_to_parts_map.values())
+
+
+def check_size(grid_size):
+    """grid_size에서 다른 항목 설명 목록 (같으면 빈 목록)."""
+    total_spots = grid_size * grid_size * TOTAL_PARTS_PER_HEX
+    legacy_map = legacy_vertex_to_parts_map(grid_size, grid_size)
+    exact_map = build_vertex_to_parts_map(grid_size, grid_size)
+    problems = []
+    if part_groups(legacy_map) != part_groups(exact_map):
+        problems.append(f"꼭짓점 맵 (예전 {len(legacy_map)}개, 지금 {len(exact_map)}개 꼭짓점)")
+    for win_type in WINNING_TYPE_OPTIONS:
+        legacy = legacy_adjacency_list(win_type, legacy_map, total_spots)
+        exact = build_adjacency_list(win_type, exact_map, total_spots)
+        different = [i for i in range(total_spots) if sorted(legacy[i]) != sorted(exact[i])]
+        if different:
+            problems.append(f"{win_type} 인접 리스트 ({len(different)}칸, 처음 {different[0]})")
+    return problems
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="격자 구조를 예전 실수 좌표 방식과 비교")
+    parser.add_argument('--sizes', type=lambda text: [int(value) for value in text.split(',')], default=DEFAULT_SIZES,
+                        help="격자 크기 목록 (쉼표로 구분)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    failed = False
+    for grid_size in args.sizes:
+        problems = check_size(grid_size)
+        print(f"N={grid_size}: {'같음' if not problems else '다름 - ' + ', '.join(problems)}")
+        failed = failed or bool(problems)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
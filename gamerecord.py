@@ -0,0 +1,76 @@
+"""기보 바이너리 형식.
+
+[매직 'HXR'][버전 1바이트] 다음에 varint(LEB128)로
+격자 크기, 인원, 승리 연결 개수, 승리 타입 번호, 항목 수, 그리고 항목마다
+flat index * 2 + 종류(0: 돌 놓기, 1: 칸 비우기)를 차례로 씁니다.
+놓은 플레이어는 재생하면서 차례로 정해지므로 따로 저장하지 않습니다.
+"""
+from hexengine import WINNING_TYPE_OPTIONS, MOVE_PLACE, GameState
+
+RECORD_MAGIC = b'HXR'
+RECORD_VERSION = 1
+
+
+def encode_varint(value, out):
+    """0 이상의 정수를 LEB128 varint로 out(bytearray)에 덧붙입니다."""
+    if value < 0: raise ValueError("varint는 0 이상의 정수만 가능")
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def decode_varint(data, pos):
+    """data[pos:]에서 varint 하나를 읽어 (값, 다음 위치)를 반환합니다."""
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data): raise ValueError("기보가 중간에 끊겼습니다")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_record(game):
+    """게임(GameState)의 설정과 지금까지 적용된 기보를 바이트열로 만듭니다."""
+    out = bytearray(RECORD_MAGIC)
+    out.append(RECORD_VERSION)
+    moves = game.applied_moves()
+    for value in (game.grid_size, game.num_players, game.min_win_length,
+                  WINNING_TYPE_OPTIONS.index(game.winning_type), len(moves)):
+        encode_varint(value, out)
+    for action, flat_index in moves:
+        encode_varint(flat_index * 2 + action, out)
+    return bytes(out)
+
+
+def decode_record(data, hex_board=None):
+    """바이트열을 읽어 기보를 재생한 GameState를 반환합니다."""
+    if len(data) <= len(RECORD_MAGIC) or data[:len(RECORD_MAGIC)] != RECORD_MAGIC: raise ValueError("기보 형식이 아닙니다")
+    if data[len(RECORD_MAGIC)] != RECORD_VERSION: raise ValueError("지원하지 않는 기보 버전")
+    pos = len(RECORD_MAGIC) + 1
+    header = []
+    for _ in range(5):
+        value, pos = decode_varint(data, pos)
+        header.append(value)
+    grid_size, num_players, min_win_length, type_index, move_count = header
+    if type_index >= len(WINNING_TYPE_OPTIONS): raise ValueError("잘못된 승리 타입")
+
+    game = GameState(grid_size, num_players, min_win_length, WINNING_TYPE_OPTIONS[type_index], hex_board=hex_board)
+    for _ in range(move_count):
+        value, pos = decode_varint(data, pos)
+        flat_index, action = divmod(value, 2)
+        if flat_index >= game.total_spots: raise ValueError("게임판 밖의 기보 항목")
+        if action == MOVE_PLACE:
+            game.play(flat_index)
+        elif not game.clear(flat_index):
+            raise ValueError("빈 칸을 비우는 기보 항목")
+    if pos != len(data): raise ValueError("기보 뒤에 남는 데이터가 있습니다")
+    return game
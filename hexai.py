@@ -0,0 +1,415 @@
+"""컴퓨터 플레이어 (paranoid 알파-베타 탐색).
+
+3~4인 게임은 paranoid 방식으로 탐색합니다. 자신(루트 플레이어)을 제외한 모든
+플레이어가 힘을 합쳐 자신에게 불리한 수를 둔다고 가정하므로 2인 알파-베타와 같은
+가지치기를 쓸 수 있습니다. Zobrist 해시 기반 치환표, 수 정렬, 시간 제한이 있는
+반복 심화를 사용합니다. 승리 판정과 수 정렬에는 착수마다 증분 갱신되는
+ThreatIndex(이기는 칸 색인)를 쓰고, 치환표 키는 게임판 대칭으로 정규화합니다.
+"""
+import random
+import time
+
+from hexengine import WINNING_TYPE_ANY_VERTEX, WINNING_TYPE_EDGE_ONLY, iter_bits, popcount, group_size_at_least
+from hexsymmetry import symmetry_table
+from hexstats import instrumented
+
+DEFAULT_TIME_LIMIT = 1.0  # 한 수당 탐색 시간 (초)
+DEFAULT_MAX_DEPTH = 64
+ZOBRIST_SEED = 20240601
+HASH_MASK = (1 << 64) - 1
+WIN_SCORE = 1_000_000
+TIME_CHECK_INTERVAL = 256  # 노드 몇 개마다 시간을 확인할지
+SYMMETRY_MAX_SPOTS = 8192  # 칸이 이보다 많은 판은 대칭 정규화를 하지 않음 (준비 비용이 크고 같은 국면도 드묾)
+TIME_CHECK_SPOTS = 32768  # 칸이 이보다 많은 판은 노드가 느리므로 더 자주 확인 (hexmcts와 같은 방식)
+TT_MAX_ENTRIES = 1_000_000  # 치환표가 이보다 커지면 비웁니다
+
+TT_EXACT = 0
+TT_LOWER = 1
+TT_UPPER = 2
+
+
+class SearchTimeout(Exception):
+    """탐색 시간 초과 (반복 심화에서 이전 깊이의 결과를 사용)."""
+
+
+class ZobristTable:
+    """(플레이어, 칸)별 64비트 난수 키.
+
+    대칭(hexsymmetry.SymmetryTable)을 주면 같은 국면이 같은 키를 갖도록, 쌍둥이 칸은 키를
+    나눠 쓰고 (그래서 XOR 대신 64비트 덧셈으로 합침) 칸 순열마다 해시를 따로 더해 가장 작은 값을 씁니다.
+    """
+
+    def __init__(self, total_spots, num_players, seed=ZOBRIST_SEED, symmetry=None):
+        rng = random.Random(seed)
+        self.cell_keys = [[rng.getrandbits(64) for _ in range(total_spots)] for _ in range(num_players)]
+        permutations = [range(total_spots)]
+        if symmetry is not None:
+            for cells in symmetry.twin_classes:
+                for keys in self.cell_keys:
+                    for cell in cells[1:]:
+                        keys[cell] = keys[cells[0]]
+            permutations = symmetry.permutations
+        # symmetric_keys[j][플레이어][칸] = j번째 순열로 옮긴 칸의 키
+        self.symmetric_keys = [[[keys[permutation[cell]] for cell in range(total_spots)] for keys in self.cell_keys]
+                               for permutation in permutations]
+        self.turn_keys = [rng.getrandbits(64) for _ in range(num_players)]
+        self.first_move_key = rng.getrandbits(64)
+        # paranoid 평가는 루트 플레이어 기준이므로 치환표 키에 루트 플레이어를 섞습니다.
+        self.root_keys = [rng.getrandbits(64) for _ in range(num_players)]
+
+    def hash_masks(self, player_masks):
+        """칸 순열별 돌 해시 목록."""
+        hashes = []
+        for keys in self.symmetric_keys:
+            value = 0
+            for player_index, mask in enumerate(player_masks):
+                for flat_index in iter_bits(mask):
+                    value += keys[player_index][flat_index]
+            hashes.append(value & HASH_MASK)
+        return hashes
+
+    def position_key(self, hashes, to_move, first_move, root_player):
+        key = min(hashes) ^ self.turn_keys[to_move] ^ self.root_keys[root_player]
+        if first_move: key ^= self.first_move_key
+        return key
+
+
+class RandomPlayer:
+    """빈 칸 중 하나를 무작위로 고르는 플레이어."""
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def choose_move(self, game, cancel_event=None):
+        moves = game.available_moves()
+        if not moves: raise ValueError("둘 수 있는 칸이 없습니다")
+        return self.rng.choice(moves)
+
+
+class GreedyPlayer:
+    """한 수 앞만 보는 플레이어: 이기는 수 -> 다음 플레이어의 승리 막기 -> 자기 돌과 많이 닿는 수."""
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def choose_move(self, game, cancel_event=None):
+        moves = game.available_moves()
+        if not moves: raise ValueError("둘 수 있는 칸이 없습니다")
+        win_masks = game.hex_board.neighbor_masks(game.winning_type)
+        own = game.player_masks[game.current_player]
+        next_player = game.players[(game.current_player_index + 1) % game.num_players]
+
+        for forced_moves in (game.winning_moves(), game.winning_moves(next_player)):
+            if forced_moves: return forced_moves[0]
+        best_score = max(popcount(win_masks[flat_index] & own) for flat_index in moves)
+        return self.rng.choice([flat_index for flat_index in moves if popcount(win_masks[flat_index] & own) == best_score])
+
+
+class AlphaBetaPlayer:
+    """반복 심화 paranoid 알파-베타 탐색으로 수를 고르는 컴퓨터 플레이어."""
+
+    def __init__(self, time_limit=DEFAULT_TIME_LIMIT, max_depth=DEFAULT_MAX_DEPTH, seed=None, book=None,
+                 search_opening=False):
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.book = book  # 오프닝 북 (hexbook.OpeningBook). 책에 있는 국면은 탐색하지 않습니다.
+        # False면 빈 판에서 탐색 없이 가운데 칸을 둡니다. True면 모든 첫 수를 탐색합니다. (오프닝 북 생성용)
+        self.search_opening = search_opening
+        self.last_score = None  # 마지막 탐색의 루트 점수 (탐색하지 않았으면 None)
+        self.rng = random.Random(seed)
+        self.transposition_table = {}
+        self._tt_config = None
+        self._zobrist = None
+        self.nodes = 0
+        self.completed_depth = 0
+        self.cancel_event = None
+
+    @instrumented('ai_search')
+    def choose_move(self, game, cancel_event=None):
+        """game(GameState)의 현재 플레이어가 둘 수를 반환합니다.
+
+        cancel_event(threading.Event)가 켜지면 시간 초과처럼 탐색을 멈추고 지금까지의 최선 수를 반환합니다.
+        """
+        moves = game.available_moves()
+        if not moves: raise ValueError("둘 수 있는 칸이 없습니다")
+        self.last_score = None
+        if len(moves) == 1: return moves[0]
+        if self.book is not None:
+            book_move = self.book.lookup(game)
+            if book_move is not None: return book_move
+        deadline = time.monotonic() + self.time_limit  # 준비 시간도 한 수의 시간에 포함
+        self._prepare(game)
+        self.cancel_event = cancel_event
+
+        root_moves = self._ordered_moves(None)
+        best_move = root_moves[0]
+        if len(root_moves) == 1: return best_move
+        self.completed_depth = 0
+        self.nodes = 0
+        for depth in range(1, self.max_depth + 1):
+            try:
+                score, move = self._search_root(root_moves, depth, deadline)
+            except SearchTimeout:
+                break
+            best_move = move
+            self.last_score = score
+            self.completed_depth = depth
+            root_moves.remove(move)
+            root_moves.insert(0, move)
+            if abs(score) >= WIN_SCORE - self.max_depth or depth >= popcount(self.empty):
+                break  # 승패가 확정되었거나 끝까지 읽었음
+        return best_move
+
+    # ------------------------------------------------------------------
+    # 탐색 준비
+    # ------------------------------------------------------------------
+    def _prepare(self, game):
+        hex_board = game.hex_board
+        config = (game.grid_size, game.num_players, game.min_win_length, game.winning_type)
+        if config != self._tt_config:
+            # 설정이 바뀌면 치환표와 Zobrist 키를 새로 만듭니다.
+            self._tt_config = config
+            symmetry = None
+            if game.total_spots <= SYMMETRY_MAX_SPOTS:
+                symmetry = symmetry_table(game.grid_size, game.winning_type, hex_board)
+            self._zobrist = ZobristTable(game.total_spots, game.num_players, symmetry=symmetry)
+            self.transposition_table = {}
+        elif len(self.transposition_table) > TT_MAX_ENTRIES:
+            self.transposition_table = {}
+
+        self.num_players = game.num_players
+        self.min_win_length = game.min_win_length
+        self.win_csr = hex_board.csr(game.winning_type)
+        self.first_move_masks = hex_board.neighbor_masks(WINNING_TYPE_EDGE_ONLY)
+        self.near_csr = hex_board.csr(WINNING_TYPE_ANY_VERTEX)
+        self.player_masks = [game.player_masks[p] for p in game.players]
+        # 평가용: 칸별 주인 번호(빈 칸 -1)와 플레이어별 돌 목록 (평가 비용이 판 크기가 아니라 돌 수에 비례)
+        player_numbers = {p: i for i, p in enumerate(game.players)}
+        self.owners = [player_numbers.get(mark, -1) for mark in game.board]
+        self.stones = [list(iter_bits(mask)) for mask in self.player_masks]
+        self.empty = game.empty_mask()
+        self.to_move = game.current_player_index
+        self.root_player = game.current_player_index
+        self.first_move = game.first_move
+        self.hashes = self._zobrist.hash_masks(self.player_masks)
+        self.threats = game.threats.copy()
+        self._threat_trail = []
+        self.time_check_interval = max(1, min(TIME_CHECK_INTERVAL, TIME_CHECK_SPOTS // game.total_spots))
+
+    # ------------------------------------------------------------------
+    # 착수 / 되돌리기 (비트마스크만 갱신)
+    # ------------------------------------------------------------------
+    def _make(self, flat_index, update_threats=True):
+        """수를 두고 승리 여부를 반환합니다. 바로 평가할 국면이면 update_threats=False로 색인 갱신을 건너뜁니다."""
+        player = self.to_move
+        bit = 1 << flat_index
+        self.player_masks[player] |= bit
+        self.empty &= ~bit
+        self.owners[flat_index] = player
+        self.stones[player].append(flat_index)
+        hashes = self.hashes
+        for j, keys in enumerate(self._zobrist.symmetric_keys):
+            hashes[j] = (hashes[j] + keys[player][flat_index]) & HASH_MASK
+        if self.first_move:
+            # 첫 수는 면 인접으로 승리를 판정합니다.
+            won = group_size_at_least(self.player_masks[player], flat_index, self.first_move_masks, self.min_win_length)
+        else:
+            won = bool(self.threats.masks[player] & bit)
+        # 이긴 국면과 바로 평가할 국면은 더 탐색하지 않으므로 색인을 갱신하지 않습니다.
+        if won or not update_threats:
+            self._threat_trail.append(None)
+        else:
+            self._threat_trail.append(self.threats.place(player, flat_index))
+        self.first_move = False
+        self.to_move = (player + 1) % self.num_players
+        return won
+
+    def _unmake(self, flat_index, was_first_move):
+        player = (self.to_move - 1) % self.num_players
+        self.to_move = player
+        bit = 1 << flat_index
+        self.player_masks[player] &= ~bit
+        self.empty |= bit
+        self.owners[flat_index] = -1
+        self.stones[player].pop()
+        hashes = self.hashes
+        for j, keys in enumerate(self._zobrist.symmetric_keys):
+            hashes[j] = (hashes[j] - keys[player][flat_index]) & HASH_MASK
+        threat_info = self._threat_trail.pop()
+        if threat_info is not None:
+            self.threats.restore(threat_info)
+        self.first_move = was_first_move
+
+    # ------------------------------------------------------------------
+    # 수 정렬과 평가
+    # ------------------------------------------------------------------
+    def _ordered_moves(self, tt_move):
+        empty = self.empty
+        if not any(self.stones) and not self.search_opening:
+            # 빈 판이면 가운데 칸 하나만 보면 충분합니다.
+            moves = list(iter_bits(empty))
+            return [moves[len(moves) // 2]]
+        threat_masks = self.threats.masks
+        to_move = self.to_move
+        if threat_masks[to_move]:
+            # 이기는 수가 있으면 그 하나만 봅니다.
+            return [(threat_masks[to_move] & -threat_masks[to_move]).bit_length() - 1]
+        # 후보와 점수는 돌 목록, 칸별 주인, CSR 인접 정보로 셉니다. (판 크기의 정수 연산 없이)
+        owners = self.owners
+        near_offsets, near_neighbors = self.near_csr
+        blocks = self._forced_blocks(threat_masks, to_move)
+        if blocks:
+            candidates = list(iter_bits(blocks))
+        else:
+            # 이미 놓인 돌 근처의 빈 칸만 후보로 봅니다. (없으면 모든 빈 칸)
+            near_empty = set()
+            for stones in self.stones:
+                for cell in stones:
+                    for k in range(near_offsets[cell], near_offsets[cell + 1]):
+                        if owners[near_neighbors[k]] < 0: near_empty.add(near_neighbors[k])
+            candidates = sorted(near_empty) if near_empty else list(iter_bits(empty))
+        other_threats = set()
+        for player, threat_mask in enumerate(threat_masks):
+            if player != to_move: other_threats.update(iter_bits(threat_mask))
+
+        scored = []
+        for flat_index in candidates:
+            own = others = free = 0
+            for k in range(near_offsets[flat_index], near_offsets[flat_index + 1]):
+                owner = owners[near_neighbors[k]]
+                if owner == to_move: own += 1
+                elif owner < 0: free += 1
+                else: others += 1
+            score = 4 * own + 2 * others + free
+            if flat_index in other_threats: score += 16  # 상대의 이기는 칸 먼저
+            scored.append((score, self.rng.random(), flat_index))
+        scored.sort(reverse=True)
+        moves = [flat_index for _, _, flat_index in scored]
+        if tt_move is not None and tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        return moves
+
+    def _forced_blocks(self, threat_masks, to_move):
+        """to_move가 막는 수만 두어야 하는 칸의 비트마스크 (없으면 0).
+
+        루트 플레이어는 상대 중 누구든 이기는 칸이 있으면 그 칸들을 막아야 합니다.
+        paranoid 탐색에서 상대들은 한편이므로 루트 플레이어의 이기는 칸만 막으면 되고,
+        루트 차례 전에 둘 다른 상대가 이미 이길 수 있으면 막을 필요도 없습니다.
+        """
+        root_player = self.root_player
+        if to_move == root_player:
+            blocks = 0
+            for player, threat_mask in enumerate(threat_masks):
+                if player != root_player: blocks |= threat_mask
+            return blocks
+        player = (to_move + 1) % self.num_players
+        while player != root_player:
+            if threat_masks[player]: return 0
+            player = (player + 1) % self.num_players
+        return threat_masks[root_player]
+
+    def _player_value(self, player):
+        """그룹 크기의 제곱 합. 더 자랄 수 없는(빈 이웃이 없는) 짧은 그룹은 0점입니다.
+
+        돌 목록과 CSR 인접 정보로 그룹을 찾으므로 비용은 판 크기가 아니라 돌 수에 비례합니다.
+        """
+        owners = self.owners
+        offsets, neighbors = self.win_csr
+        seen = set()
+        value = 0
+        for start in self.stones[player]:
+            if start in seen: continue
+            seen.add(start)
+            stack = [start]
+            size = 0
+            free = False
+            while stack:
+                cell = stack.pop()
+                size += 1
+                for k in range(offsets[cell], offsets[cell + 1]):
+                    neighbor = neighbors[k]
+                    owner = owners[neighbor]
+                    if owner == player:
+                        if neighbor not in seen:
+                            seen.add(neighbor)
+                            stack.append(neighbor)
+                    elif owner < 0:
+                        free = True
+            if free: value += size * size
+        return value
+
+    def _evaluate(self):
+        values = [self._player_value(player) for player in range(self.num_players)]
+        own = values[self.root_player]
+        del values[self.root_player]
+        return own - max(values)
+
+    # ------------------------------------------------------------------
+    # 탐색
+    # ------------------------------------------------------------------
+    def _search_root(self, root_moves, depth, deadline):
+        self.deadline = deadline
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_score, best_move = -WIN_SCORE - 1, root_moves[0]
+        for move in root_moves:
+            self._check_time()  # 루트 수마다 한 번은 확인 (큰 판에서는 노드 수로 세면 너무 늦음)
+            score = self._score_move(move, depth, alpha, beta, 1)
+            if score > best_score:
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+        return best_score, best_move
+
+    def _score_move(self, move, depth, alpha, beta, ply):
+        was_first_move = self.first_move
+        mover = self.to_move
+        won = self._make(move, update_threats=depth > 1)
+        try:
+            if won:
+                return WIN_SCORE - ply if mover == self.root_player else -(WIN_SCORE - ply)
+            if not self.empty:
+                return 0
+            return self._search(depth - 1, alpha, beta, ply)
+        finally:
+            self._unmake(move, was_first_move)
+
+    def _check_time(self):
+        if time.monotonic() > self.deadline or (self.cancel_event is not None and self.cancel_event.is_set()):
+            raise SearchTimeout()
+
+    def _search(self, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes % self.time_check_interval == 0: self._check_time()
+
+        key = self._zobrist.position_key(self.hashes, self.to_move, self.first_move, self.root_player)
+        entry = self.transposition_table.get(key)
+        tt_move = None
+        if entry is not None:
+            entry_depth, entry_value, entry_flag, tt_move = entry
+            if entry_depth >= depth:
+                if entry_flag == TT_EXACT: return entry_value
+                if entry_flag == TT_LOWER and entry_value >= beta: return entry_value
+                if entry_flag == TT_UPPER and entry_value <= alpha: return entry_value
+
+        if depth == 0:
+            return self._evaluate()
+
+        original_alpha, original_beta = alpha, beta
+        maximizing = self.to_move == self.root_player
+        best_score = -WIN_SCORE - 1 if maximizing else WIN_SCORE + 1
+        best_move = None
+        for move in self._ordered_moves(tt_move):
+            score = self._score_move(move, depth, alpha, beta, ply + 1)
+            if maximizing:
+                if score > best_score: best_score, best_move = score, move
+                alpha = max(alpha, score)
+            else:
+                if score < best_score: best_score, best_move = score, move
+                beta = min(beta, score)
+            if alpha >= beta: break
+
+        if best_score <= original_alpha: flag = TT_UPPER
+        elif best_score >= original_beta: flag = TT_LOWER
+        else: flag = TT_EXACT
+        self.transposition_table[key] = (depth, best_score, flag, best_move)
+        return best_score
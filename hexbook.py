@@ -0,0 +1,257 @@
+"""작은 설정용 오프닝 북 (미리 탐색한 최선 수 표).
+
+책 생성:
+    python hexbook.py --grid-sizes 2,3 --players 2,3,4 --win-types any,edge,vertex --plies 2 \
+        --time-limit 1.0 --workers 8 --output opening_book.hxbook
+
+빈 판부터 plies 수까지 나올 수 있는 모든 국면을 대칭으로 정규화해(hexsymmetry) 중복 없이 모으고,
+국면마다 알파-베타로 깊게 탐색한 최선 수와 결과를 기록합니다. 빈 판도 가운데 칸으로 정하지 않고
+모든 첫 수를 탐색하며, 첫 수의 면 인접 규칙도 탐색(GameState.first_move)에 그대로 반영됩니다.
+
+함께 들어 있는 opening_book.hxbook은 위 명령(모든 설정 2수)으로 만든 것이라 기본 로비(3x3, 4인)는
+일부만 담고 있습니다. 4인 설정은 2수까지의 결과가 모두 OUTCOME_UNKNOWN이고, P4의 첫 수(3수째)부터는
+책에 없어 평소처럼 탐색합니다. --config-plies 3x4=3 으로 3x3 4인 설정만 3수까지 늘릴 수 있지만,
+승리 타입 셋을 합해 약 4만 9천 국면이 늘어 국면당 1초면 14 CPU 시간쯤 걸립니다.
+
+파일 형식: [매직 'HXBK'][버전 1바이트] 다음 varint로 설정 묶음 수, 묶음마다
+격자 크기, 인원, 승리 연결 개수, 승리 타입 번호, 항목 수, 그리고 항목마다 정규화 키의
+플레이어별 마스크(둘 차례부터), 정규화 좌표의 최선 수, 결과를 씁니다.
+불러온 책은 (설정, 정규화 키) 사전이므로 탐색 전에 O(1)로 찾아봅니다.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from hexengine import WINNING_TYPE_OPTIONS, WIN_TYPE_ALIASES, GameState
+from hexai import AlphaBetaPlayer, WIN_SCORE
+from hexsymmetry import symmetry_table
+from gamerecord import encode_varint, decode_varint
+
+BOOK_MAGIC = b'HXBK'
+BOOK_VERSION = 1
+DEFAULT_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.hxbook")
+DEFAULT_BOOK_PLIES = 2  # 설정별로 --config-plies에서 따로 정할 수 있음
+DEFAULT_BOOK_TIME_LIMIT = 1.0  # 국면당 탐색 시간 (초)
+DEFAULT_BOOK_WIN_LENGTH = 3
+
+# 결과 (둘 차례인 플레이어 기준, paranoid 탐색 결과)
+OUTCOME_UNKNOWN = 0
+OUTCOME_WIN = 1
+OUTCOME_LOSS = 2
+
+
+class OpeningBook:
+    """{(격자 크기, 인원, 승리 연결 개수, 승리 타입): {정규화 키: (정규화 좌표의 수, 결과)}}."""
+
+    def __init__(self):
+        self.sections = {}
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.sections.values())
+
+    def add(self, config, key, move, outcome):
+        self.sections.setdefault(config, {})[key] = (move, outcome)
+
+    def probe(self, game):
+        """game(GameState) 국면이 책에 있으면 (원래 좌표의 수, 결과), 없으면 None."""
+        entries = self.sections.get((game.grid_size, game.num_players, game.min_win_length, game.winning_type))
+        if entries is None or not game.game_active: return None
+        table = symmetry_table(game.grid_size, game.winning_type, game.hex_board)
+        key, transform = table.canonicalize([game.player_masks[p] for p in game.players], game.current_player_index)
+        entry = entries.get(key)
+        if entry is None: return None
+        move, outcome = entry
+        return table.unmap_move(move, transform), outcome
+
+    def lookup(self, game):
+        """책에 있는 최선 수 (없으면 None)."""
+        found = self.probe(game)
+        return None if found is None else found[0]
+
+    def to_bytes(self):
+        out = bytearray(BOOK_MAGIC)
+        out.append(BOOK_VERSION)
+        encode_varint(len(self.sections), out)
+        for config in sorted(self.sections, key=lambda c: (c[0], c[1], c[2], WINNING_TYPE_OPTIONS.index(c[3]))):
+            grid_size, num_players, min_win_length, winning_type = config
+            entries = self.sections[config]
+            for value in (grid_size, num_players, min_win_length, WINNING_TYPE_OPTIONS.index(winning_type), len(entries)):
+                encode_varint(value, out)
+            for key in sorted(entries):
+                move, outcome = entries[key]
+                for mask in key:
+                    encode_varint(mask, out)
+                encode_varint(move, out)
+                out.append(outcome)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) <= len(BOOK_MAGIC) or data[:len(BOOK_MAGIC)] != BOOK_MAGIC: raise ValueError("오프닝 북 형식이 아닙니다")
+        if data[len(BOOK_MAGIC)] != BOOK_VERSION: raise ValueError("지원하지 않는 오프닝 북 버전")
+        book = cls()
+        section_count, pos = decode_varint(data, len(BOOK_MAGIC) + 1)
+        for _ in range(section_count):
+            header = []
+            for _ in range(5):
+                value, pos = decode_varint(data, pos)
+                header.append(value)
+            grid_size, num_players, min_win_length, type_index, entry_count = header
+            if type_index >= len(WINNING_TYPE_OPTIONS): raise ValueError("잘못된 승리 타입")
+            config = (grid_size, num_players, min_win_length, WINNING_TYPE_OPTIONS[type_index])
+            entries = book.sections.setdefault(config, {})
+            for _ in range(entry_count):
+                masks = []
+                for _ in range(num_players):
+                    mask, pos = decode_varint(data, pos)
+                    masks.append(mask)
+                move, pos = decode_varint(data, pos)
+                if pos >= len(data): raise ValueError("오프닝 북이 중간에 끊겼습니다")
+                entries[tuple(masks)] = (move, data[pos])
+                pos += 1
+        if pos != len(data): raise ValueError("오프닝 북 뒤에 남는 데이터가 있습니다")
+        return book
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def load_default_book():
+    """모듈 옆의 기본 오프닝 북을 읽습니다. 없거나 읽을 수 없으면 None."""
+    try:
+        return OpeningBook.load(DEFAULT_BOOK_PATH)
+    except (OSError, ValueError):
+        return None
+
+# ----------------------------------------------------------------------
+# 책 생성
+# ----------------------------------------------------------------------
+def solve_position(spec):
+    """기보 (flat index 목록)로 국면을 만들고 (최선 수, 결과)를 반환합니다. (작업 프로세스에서 실행)"""
+    config, moves, time_limit = spec
+    game = GameState(*config)
+    for flat_index in moves:
+        game.play(flat_index)
+    winning_moves = game.winning_moves()
+    if winning_moves: return winning_moves[0], OUTCOME_WIN
+
+    player = AlphaBetaPlayer(time_limit=time_limit, seed=0, search_opening=True)  # 빈 판도 실제로 탐색
+    move = player.choose_move(game)
+    score = player.last_score
+    outcome = OUTCOME_UNKNOWN
+    if score is not None and abs(score) >= WIN_SCORE - player.max_depth:
+        outcome = OUTCOME_WIN if score > 0 else OUTCOME_LOSS
+    return move, outcome
+
+
+def book_positions(config, plies):
+    """빈 판부터 plies 수까지의 서로 다른 (정규화) 국면: [(정규화 키, 변환, 기보)]."""
+    grid_size, _, _, winning_type = config
+    table = symmetry_table(grid_size, winning_type)
+    start = GameState(*config)
+    frontier = [start]
+    seen = set()
+    positions = []
+    for ply in range(plies + 1):
+        next_frontier = []
+        for game in frontier:
+            key, transform = table.canonicalize([game.player_masks[p] for p in game.players], game.current_player_index)
+            if key in seen: continue
+            seen.add(key)
+            positions.append((key, transform, [flat_index for _, flat_index in game.applied_moves()]))
+            if ply == plies: continue
+            for flat_index in game.available_moves():
+                child = game.copy()
+                child.play(flat_index)
+                if child.game_active: next_frontier.append(child)
+        frontier = next_frontier
+    return positions
+
+
+def generate_book(configs, plies, time_limit, workers, progress=None, config_plies=None):
+    """config_plies: {(격자 크기, 인원): 수} - 이 설정들은 plies 대신 이 수까지 넣습니다."""
+    config_plies = config_plies or {}
+    book = OpeningBook()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for config in configs:
+            table = symmetry_table(config[0], config[3])
+            positions = book_positions(config, config_plies.get(config[:2], plies))
+            specs = [(config, moves, time_limit) for _, _, moves in positions]
+            results = executor.map(solve_position, specs) if executor is not None else map(solve_position, specs)
+            for (key, transform, _), (move, outcome) in zip(positions, results):
+                book.add(config, key, table.map_move(move, transform), outcome)
+            if progress is not None: progress(config, len(positions))
+    finally:
+        if executor is not None: executor.shutdown()
+    return book
+
+
+def parse_int_list(text):
+    return [int(value) for value in text.split(',')]
+
+
+def parse_config_plies(text):
+    """'3x4=3,2x2=4' -> {(3, 4): 3, (2, 2): 4} (격자 크기x인원=수)."""
+    config_plies = {}
+    for item in text.split(','):
+        if not item.strip(): continue
+        config, plies = item.split('=')
+        grid_size, num_players = config.split('x')
+        config_plies[(int(grid_size), int(num_players))] = int(plies)
+    return config_plies
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="육각형 틱택토 오프닝 북 생성")
+    parser.add_argument('--grid-sizes', type=parse_int_list, default=[2, 3], help="격자 크기 목록 (쉼표로 구분)")
+    parser.add_argument('--players', type=parse_int_list, default=[2, 3, 4], help="참여 인원 목록 (쉼표로 구분)")
+    parser.add_argument('--win-length', type=int, default=DEFAULT_BOOK_WIN_LENGTH, help="승리 연결 개수")
+    parser.add_argument('--win-types', default='any,edge,vertex', help="승리 조건 목록: any/edge/vertex (쉼표로 구분)")
+    parser.add_argument('--plies', type=int, default=DEFAULT_BOOK_PLIES, help="빈 판부터 몇 수까지의 국면을 넣을지")
+    parser.add_argument('--config-plies', type=parse_config_plies, default={},
+                        help="설정별 수 (격자 크기x인원=수, 쉼표로 구분. 예: 3x4=3)")
+    parser.add_argument('--time-limit', type=float, default=DEFAULT_BOOK_TIME_LIMIT, help="국면당 탐색 시간 (초)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="작업 프로세스 수")
+    parser.add_argument('--output', default=DEFAULT_BOOK_PATH, help="오프닝 북 파일")
+    args = parser.parse_args(argv)
+
+    win_types = []
+    for name in args.win_types.split(','):
+        win_type = WIN_TYPE_ALIASES.get(name.strip(), name.strip())
+        if win_type not in WINNING_TYPE_OPTIONS: parser.error(f"잘못된 승리 타입: {name}")
+        win_types.append(win_type)
+    args.configs = [(grid_size, num_players, args.win_length, win_type)
+                    for grid_size in args.grid_sizes for num_players in args.players for win_type in win_types]
+    for config in args.configs:
+        try:
+            GameState(*config)  # 설정 검증
+        except ValueError as e:
+            parser.error(f"{config}: {e}")
+    if args.plies < 0 or min(args.config_plies.values(), default=0) < 0 or args.workers < 1: parser.error("plies는 0 이상, 작업 프로세스 수는 1 이상")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    started = time.perf_counter()
+
+    def progress(config, count):
+        print(f"{config}: {count} 국면 ({time.perf_counter() - started:.1f}초)", file=sys.stderr)
+
+    book = generate_book(args.configs, args.plies, args.time_limit, args.workers, progress, args.config_plies)
+    book.save(args.output)
+    print(f"{len(book)} 국면, {os.path.getsize(args.output)} 바이트 -> {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
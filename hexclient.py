@@ -0,0 +1,94 @@
+"""hexserver에 접속하는 클라이언트 (Tk 화면, 스크립트 등 동기 코드용).
+
+받은 메시지는 작업 스레드가 줄 단위 JSON으로 읽어 queue에 넣고, 화면 쪽은 poll()로 꺼내 씁니다.
+연결이 끊기면 None이 한 번 들어옵니다.
+"""
+import itertools
+import json
+import queue
+import socket
+import threading
+import time
+
+CONNECT_TIMEOUT = 5.0  # 접속 대기 시간 (초)
+
+
+def parse_address(address):
+    """'host:port' 또는 'unix:/경로' -> (소켓 종류, 접속 대상)."""
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+    host, _, port = address.rpartition(':')
+    if not host or not port.isdigit(): raise ValueError(f"서버 주소 형식: host:port 또는 unix:/경로 ({address})")
+    return socket.AF_INET, (host, int(port))
+
+
+class ServerConnection:
+    """서버와의 연결 하나. 요청은 request()로 보내고, 응답과 알림은 poll()/call()로 받습니다."""
+
+    def __init__(self, address, timeout=CONNECT_TIMEOUT):
+        family, target = parse_address(address)
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(target)
+        self.sock.settimeout(None)
+        self.messages = queue.Queue()
+        self._backlog = []  # call()이 기다리는 동안 받은 다른 메시지
+        self._send_lock = threading.Lock()
+        self._request_ids = itertools.count(1)
+        self._reader = threading.Thread(target=self._read_loop, name="hexclient-reader", daemon=True)
+        self._reader.start()
+
+    def _read_loop(self):
+        try:
+            with self.sock.makefile('r', encoding='utf-8') as lines:
+                for line in lines:
+                    if not line.strip(): continue
+                    try:
+                        self.messages.put(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+        self.messages.put(None)  # 연결 끊김
+
+    def send(self, message):
+        data = (json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._send_lock:
+            self.sock.sendall(data)
+
+    def request(self, op, **fields):
+        """요청을 보내고 응답을 찾을 때 쓸 id를 반환합니다."""
+        request_id = next(self._request_ids)
+        self.send(dict(fields, op=op, id=request_id))
+        return request_id
+
+    def poll(self):
+        """지금까지 받은 메시지 목록 (기다리지 않음)."""
+        messages, self._backlog = self._backlog, []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def call(self, op, timeout=CONNECT_TIMEOUT, **fields):
+        """요청을 보내고 응답을 기다려 반환합니다. 그 사이 받은 알림은 다음 poll()에서 돌려줍니다."""
+        request_id = self.request(op, **fields)
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0: raise TimeoutError(f"서버 응답 없음: {op}")
+            try:
+                message = self.messages.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if message is None: raise ConnectionError("서버 연결이 끊겼습니다")
+            if message.get('id') == request_id: return message
+            self._backlog.append(message)
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
@@ -0,0 +1,694 @@
+"""육각형 틱택토 게임 규칙 엔진 (tkinter 없이 동작)."""
+import collections
+from array import array
+
+from hexstats import instrumented
+
+# ----------------------------------------------------------------------
+# 게임 규칙 상수
+# ----------------------------------------------------------------------
+TOTAL_PARTS_PER_HEX = 3
+DEFAULT_NUM_PLAYERS = 4
+DEFAULT_GRID_SIZE = 3
+DEFAULT_WINNING_LENGTH = 3
+WINNING_TYPE_ANY_VERTEX = "일반 모드"
+WINNING_TYPE_EDGE_ONLY = "면 모드"
+WINNING_TYPE_VERTEX_ONLY = "꼭짓점 모드"
+WINNING_TYPE_OPTIONS = [WINNING_TYPE_ANY_VERTEX, WINNING_TYPE_EDGE_ONLY, WINNING_TYPE_VERTEX_ONLY]
+DEFAULT_WINNING_TYPE = WINNING_TYPE_ANY_VERTEX
+# 명령줄 도구에서 쓰는 승리 타입 짧은 이름
+WIN_TYPE_ALIASES = {
+    'any': WINNING_TYPE_ANY_VERTEX,
+    'edge': WINNING_TYPE_EDGE_ONLY,
+    'vertex': WINNING_TYPE_VERTEX_ONLY,
+}
+DEFAULT_PLAYERS = ['P1', 'P2', 'P3', 'P4']
+EMPTY = ' '
+
+# 기보(history) 항목 종류
+MOVE_PLACE = 0  # 돌 놓기
+MOVE_CLEAR = 1  # 수정 모드로 칸 비우기
+
+MIN_GRID_SIZE = 2
+MAX_GRID_SIZE = 200
+MIN_WINNING_LENGTH = 3
+# 칸이 이보다 많으면 이웃 비트마스크를 미리 만들지 않고 요청할 때 만듭니다. (미리 만들면 칸 수의 제곱 비트)
+NEIGHBOR_MASK_PRECOMPUTE_LIMIT = 8192
+ITER_BITS_SCAN_THRESHOLD = 64  # 비트를 이만큼 꺼낸 뒤에도 남아 있으면 나머지는 2진 문자열로 바꿔 한 번에 훑음
+
+# 육각형 꼭짓점의 정수 격자 오프셋 (각도 90, 30, -30, -90, -150, 150도 순서, 마지막은 중심)
+HEX_VERTEX_LATTICE_OFFSETS = [(0, 2), (1, 1), (1, -1), (0, -2), (-1, -1), (-1, 1), (0, 0)]
+# 부분 도형(0/1/2)이 사용하는 꼭짓점 번호 (6 = 중심)
+PART_VERTEX_INDICES = [[6, 0, 1, 2], [6, 2, 3, 4], [6, 4, 5, 0]]
+
+# ----------------------------------------------------------------------
+# 좌표 변환 함수
+# ----------------------------------------------------------------------
+def flat_to_coords(flat_index, rows, cols):
+    if not 0 <= flat_index < rows * cols * TOTAL_PARTS_PER_HEX: return -1, -1, -1
+    hex_index = flat_index // TOTAL_PARTS_PER_HEX
+    part_index = flat_index % TOTAL_PARTS_PER_HEX
+    row = hex_index // cols
+    col = hex_index % cols
+    return row, col, part_index
+
+def coords_to_flat(row, col, part_index, rows, cols):
+    if not (0 <= row < rows and 0 <= col < cols and 0 <= part_index < TOTAL_PARTS_PER_HEX): return -1
+    hex_index = row * cols + col
+    flat_index = hex_index * TOTAL_PARTS_PER_HEX + part_index
+    return flat_index
+
+# ----------------------------------------------------------------------
+# 인접 리스트 계산 함수
+# ----------------------------------------------------------------------
+def build_vertex_to_parts_map(rows, cols):
+    """꼭짓점(정수 격자 키) -> 그 꼭짓점을 가진 부분 도형 flat index 리스트."""
+    # 꼭짓점 좌표를 x는 √3/2, y는 1/2 단위의 정수로 표현하면 실수 반올림 없이 정확히 일치합니다.
+    # 중심 (row, col)의 정수 좌표: x = 2*q + row = 2*col + (row % 2), y = 3*row
+    stride = 2 * cols + 3  # x 범위 -1 .. 2*cols
+    vertex_key_offsets = [dy * stride + dx for dx, dy in HEX_VERTEX_LATTICE_OFFSETS]
+    part_key_offsets = [[vertex_key_offsets[v_idx] for v_idx in PART_VERTEX_INDICES[part_index]]
+                        for part_index in range(TOTAL_PARTS_PER_HEX)]
+
+    vertex_to_parts_map = {}
+    flat_index = 0
+    for row in range(rows):
+        row_base = (3 * row + 2) * stride + (row % 2) + 1
+        for col in range(cols):
+            center_key = row_base + 2 * col
+            for key_offsets in part_key_offsets:
+                for key_offset in key_offsets:
+                    key = center_key + key_offset
+                    parts = vertex_to_parts_map.get(key)
+                    if parts is None:
+                        vertex_to_parts_map[key] = [flat_index]
+                    else:
+                        parts.append(flat_index)
+                flat_index += 1
+    return vertex_to_parts_map
+
+@instrumented('adjacency_build')
+def build_adjacency_csr(vertex_to_parts_map, total_spots):
+    """세 승리 타입의 인접 정보를 한 번에 CSR (offsets, neighbors) 정수 배열로 만듭니다."""
+    # 부분 도형마다 자기 꼭짓점(4개)을 가진 다른 부분 도형의 공유 꼭짓점 수를 작은 사전에 셉니다.
+    # (판 전체 쌍 사전을 만들지 않으므로 메모리는 CSR 배열 크기 정도)
+    part_vertex_parts = [[] for _ in range(total_spots)]
+    for parts in vertex_to_parts_map.values():
+        for part in parts:
+            part_vertex_parts[part].append(parts)
+
+    csr = {win_type: (array('i', [0]), array('i')) for win_type in WINNING_TYPE_OPTIONS}
+    any_offsets, any_neighbors = csr[WINNING_TYPE_ANY_VERTEX]
+    edge_offsets, edge_neighbors = csr[WINNING_TYPE_EDGE_ONLY]
+    vertex_offsets, vertex_neighbors = csr[WINNING_TYPE_VERTEX_ONLY]
+    for part, vertex_parts in enumerate(part_vertex_parts):
+        shared_counts = {}
+        for parts in vertex_parts:
+            for other in parts:
+                shared_counts[other] = shared_counts.get(other, 0) + 1
+        shared_counts.pop(part, None)
+        for other in sorted(shared_counts):
+            any_neighbors.append(other)
+            if shared_counts[other] >= 2: edge_neighbors.append(other)
+            else: vertex_neighbors.append(other)
+        any_offsets.append(len(any_neighbors))
+        edge_offsets.append(len(edge_neighbors))
+        vertex_offsets.append(len(vertex_neighbors))
+    return csr
+
+def csr_to_lists(csr):
+    offsets, neighbors = csr
+    return [neighbors[offsets[i]:offsets[i + 1]].tolist() for i in range(len(offsets) - 1)]
+
+def build_adjacency_list(win_type, vertex_to_parts_map, total_spots):
+    csr = build_adjacency_csr(vertex_to_parts_map, total_spots).get(win_type)
+    if csr is None: return [[] for _ in range(total_spots)]
+    return csr_to_lists(csr)
+
+# ----------------------------------------------------------------------
+# 승리 조건 확인, 무승부 확인, 가능한 수 계산 함수
+# ----------------------------------------------------------------------
+def check_win_adjacency(board, adjacency_list, min_win_length, last_move_flat_index):
+    player_mark = board[last_move_flat_index]
+    if player_mark == EMPTY: return None
+
+    total_spots = len(board)
+    visited = set()
+    queue = collections.deque([last_move_flat_index])
+    visited.add(last_move_flat_index)
+    count = 0
+
+    while queue:
+        current_flat_index = queue.popleft()
+        count += 1
+        if current_flat_index < 0 or current_flat_index >= len(adjacency_list): continue
+        for neighbor_flat_index in adjacency_list[current_flat_index]:
+            if 0 <= neighbor_flat_index < total_spots and board[neighbor_flat_index] == player_mark and neighbor_flat_index not in visited:
+                visited.add(neighbor_flat_index)
+                queue.append(neighbor_flat_index)
+
+    return player_mark if count >= min_win_length else None
+
+def check_draw(board):
+    return EMPTY not in board
+
+def calculate_available_moves(board):
+    """현재 보드 상태에서 놓을 수 있는 칸의 수를 계산합니다."""
+    return board.count(EMPTY)
+
+# ----------------------------------------------------------------------
+# 비트보드 (칸 i = 비트 i) 연산 함수
+# ----------------------------------------------------------------------
+def iter_bits(mask):
+    """켜진 비트의 flat index를 작은 것부터 차례로 반환합니다."""
+    for _ in range(ITER_BITS_SCAN_THRESHOLD):
+        if not mask: return
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+    # 비트마다 큰 정수를 새로 만들면 (켜진 비트 수 x 판 크기)가 되므로 많이 남았으면 2진 문자열에서 찾습니다.
+    digits = bin(mask)[:1:-1]
+    flat_index = digits.find('1')
+    while flat_index >= 0:
+        yield flat_index
+        flat_index = digits.find('1', flat_index + 1)
+
+def popcount(mask):
+    return mask.bit_count()
+
+def build_neighbor_masks(csr):
+    """칸별 이웃 비트마스크 리스트를 CSR 인접 정보에서 만듭니다."""
+    offsets, neighbors = csr
+    masks = []
+    for i in range(len(offsets) - 1):
+        mask = 0
+        for k in range(offsets[i], offsets[i + 1]):
+            mask |= 1 << neighbors[k]
+        masks.append(mask)
+    return masks
+
+class LazyNeighborMasks:
+    """build_neighbor_masks와 같은 값을 칸마다 요청할 때 CSR에서 만듭니다. (큰 판용)
+
+    이웃은 가까운 번호에 모여 있으므로 작은 마스크를 만든 뒤 한 번만 옮깁니다.
+    """
+
+    def __init__(self, csr):
+        self.offsets, self.neighbors = csr
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, flat_index):
+        start, end = self.offsets[flat_index], self.offsets[flat_index + 1]
+        if start == end: return 0
+        neighbors = self.neighbors
+        base = min(neighbors[start:end])
+        mask = 0
+        for k in range(start, end):
+            mask |= 1 << (neighbors[k] - base)
+        return mask << base
+
+def expand_mask(mask, neighbor_masks):
+    """mask에 속한 칸들의 이웃 칸 전체 (mask 자신은 제외)."""
+    expanded = 0
+    for i in iter_bits(mask):
+        expanded |= neighbor_masks[i]
+    return expanded & ~mask
+
+def group_mask(owned_mask, start, neighbor_masks):
+    """owned_mask 안에서 start와 연결된 그룹의 비트마스크 (비트 단위 flood fill)."""
+    group = frontier = 1 << start
+    while frontier:
+        frontier = expand_mask(frontier, neighbor_masks) & owned_mask & ~group
+        group |= frontier
+    return group
+
+def group_size_at_least(owned_mask, start, neighbor_masks, limit):
+    """start가 속한 그룹의 크기가 limit 이상인지 확인합니다. (limit에 닿으면 바로 종료)"""
+    group = frontier = 1 << start
+    size = 1
+    while frontier and size < limit:
+        frontier = expand_mask(frontier, neighbor_masks) & owned_mask & ~group
+        group |= frontier
+        size += popcount(frontier)
+    return size >= limit
+
+# ----------------------------------------------------------------------
+# 승리 직전 칸 색인 (이기는 수 / 막아야 할 수)
+# ----------------------------------------------------------------------
+class ThreatIndex:
+    """플레이어별로 '두면 바로 승리 길이에 닿는 빈 칸'의 비트마스크를 유지합니다.
+
+    칸별 주인(owners)과 CSR 인접 정보로 놓은 돌의 그룹과 그 주변 빈 칸만 훑으므로, 칸마다 판 크기의
+    정수를 만들지 않고 그룹 주변 크기에 비례하는 시간에 갱신합니다. (진행 중인 게임의 그룹은 승리 길이보다 작음)
+    masks 자체는 큰 정수이므로 수마다 판 크기의 비트 연산이 몇 번(바뀐 비트 반영)은 있습니다.
+    승리 타입 인접 기준입니다. 첫 수의 면 인접 규칙은 돌 하나로는 이길 수 없으므로 상관없습니다.
+    """
+
+    def __init__(self, csr, num_players, min_win_length):
+        self.offsets, self.neighbors = csr
+        self.min_win_length = min_win_length
+        self.masks = [0] * num_players
+        self.owners = bytearray(len(self.offsets) - 1)  # 칸별 (플레이어 번호 + 1), 빈 칸은 0
+
+    def _group(self, owner, start, limit):
+        """start와 이어진 주인이 owner인 칸들 (start 포함). limit개에 닿으면 더 찾지 않습니다."""
+        offsets, neighbors, owners = self.offsets, self.neighbors, self.owners
+        group = {start}
+        stack = [start]
+        while stack and len(group) < limit:
+            cell = stack.pop()
+            for k in range(offsets[cell], offsets[cell + 1]):
+                neighbor = neighbors[k]
+                if owners[neighbor] == owner and neighbor not in group:
+                    group.add(neighbor)
+                    stack.append(neighbor)
+        return group
+
+    def _frontier(self, group):
+        """group 주변의 빈 칸 집합."""
+        offsets, neighbors, owners = self.offsets, self.neighbors, self.owners
+        frontier = set()
+        for cell in group:
+            for k in range(offsets[cell], offsets[cell + 1]):
+                neighbor = neighbors[k]
+                if not owners[neighbor]: frontier.add(neighbor)
+        return frontier
+
+    def _winning_cells(self, owner, group, frontier):
+        """frontier 중 owner가 두면 승리 길이에 닿는 칸 목록. (group: frontier가 둘러싼 그룹, 모르면 빈 집합)"""
+        limit = self.min_win_length
+        if len(group) + 1 >= limit: return list(frontier)
+        offsets, neighbors, owners = self.offsets, self.neighbors, self.owners
+        winning = []
+        for cell in frontier:
+            # 그 칸에 두면 group과 칸에 닿은 다른 그룹들이 하나로 합쳐집니다.
+            size = len(group) + 1
+            counted = group
+            for k in range(offsets[cell], offsets[cell + 1]):
+                neighbor = neighbors[k]
+                if owners[neighbor] == owner and neighbor not in counted:
+                    other = self._group(owner, neighbor, limit)
+                    counted = counted | other
+                    size += len(other)
+            if size >= limit: winning.append(cell)
+        return winning
+
+    def place(self, player, flat_index):
+        """player가 flat_index에 돌을 놓을 때 호출합니다.
+
+        restore()에 넘기면 놓기 전으로 돌아가는 값을 반환합니다. 마스크 전체가 아니라 바뀐 비트만 담으므로
+        큰 판에서도 기보 한 항목의 크기가 판 크기에 비례하지 않습니다.
+        """
+        masks = self.masks
+        cleared = [i for i, mask in enumerate(masks) if mask >> flat_index & 1]  # 이 칸을 노리던 플레이어
+        for i in cleared:
+            masks[i] ^= 1 << flat_index
+        owner = player + 1
+        self.owners[flat_index] = owner
+
+        # 다른 플레이어의 그룹은 그대로이므로 놓은 플레이어의, 커진 그룹 주변만 다시 봅니다.
+        group = self._group(owner, flat_index, len(self.owners))
+        frontier = self._frontier(group)
+        if frontier:
+            # 이미 이기는 칸은 다시 확인하지 않도록 주변 빈 칸 구간의 비트만 꺼내 봅니다.
+            low = min(frontier)
+            window = masks[player] >> low & ((1 << (max(frontier) - low + 1)) - 1)
+            frontier.difference_update(low + i for i in iter_bits(window))
+        gained_cells = self._winning_cells(owner, group, frontier)
+        if not gained_cells: return player, flat_index, cleared, 0, 0
+        # 새로 생긴 비트는 놓은 칸 근처에 모여 있으므로 가장 낮은 비트 기준으로 줄여 보관합니다.
+        shift = min(gained_cells)
+        gained = 0
+        for cell in gained_cells:
+            gained |= 1 << (cell - shift)
+        masks[player] |= gained << shift
+        return player, flat_index, cleared, shift, gained
+
+    def restore(self, saved):
+        """place()가 반환한 값으로 놓기 전 상태로 되돌립니다. (놓은 순서의 반대로 호출)"""
+        player, flat_index, cleared, shift, gained = saved
+        masks = self.masks
+        masks[player] ^= gained << shift
+        bit = 1 << flat_index
+        for i in cleared:
+            masks[i] |= bit
+        self.owners[flat_index] = 0
+
+    def rebuild(self, player_masks):
+        """처음부터 다시 계산합니다. (돌을 지워 그룹이 나뉠 수 있을 때)"""
+        owners = self.owners = bytearray(len(self.owners))
+        for player, owned_mask in enumerate(player_masks):
+            for cell in iter_bits(owned_mask):
+                owners[cell] = player + 1
+        for player, owned_mask in enumerate(player_masks):
+            bits = bytearray((len(owners) + 7) // 8)
+            for cell in self._winning_cells(player + 1, set(), self._frontier(iter_bits(owned_mask))):
+                bits[cell >> 3] |= 1 << (cell & 7)
+            self.masks[player] = int.from_bytes(bits, 'little')
+
+    def copy(self):
+        other = ThreatIndex((self.offsets, self.neighbors), 0, self.min_win_length)
+        other.masks = self.masks[:]
+        other.owners = self.owners[:]
+        return other
+
+# ----------------------------------------------------------------------
+# 연결 그룹 추적 (증분 승리 판정)
+# ----------------------------------------------------------------------
+class ConnectivityTracker:
+    """한 플레이어 돌들의 연결 그룹 (union-find: 크기 기준 합치기 + 경로 압축).
+
+    parent/size에 쓴 값은 모두 trail에 (칸*2 + 종류, 이전 값)으로 기록해 두므로,
+    mark()로 표시한 시점까지 쓴 만큼만 되감아 수를 무를 수 있습니다. (경로 압축 포함)
+    """
+
+    def __init__(self, total_spots, csr):
+        self.offsets, self.neighbors = csr
+        self.parent = array('i', [-1]) * total_spots  # -1: 이 플레이어의 돌이 아님
+        self.size = array('i', [0]) * total_spots
+        self.trail = array('i')
+        self.generation = 0  # rebuild 때마다 증가 (이전 mark는 더 이상 되감을 수 없음)
+
+    def find(self, flat_index):
+        parent, trail = self.parent, self.trail
+        root = flat_index
+        while parent[root] != root:
+            root = parent[root]
+        while parent[flat_index] != root:
+            trail.append(flat_index * 2)
+            trail.append(parent[flat_index])
+            parent[flat_index], flat_index = root, parent[flat_index]
+        return root
+
+    def add(self, flat_index):
+        """돌을 추가하고 이웃 그룹과 합친 뒤, 그 그룹의 크기를 반환합니다."""
+        parent, size, neighbors, trail = self.parent, self.size, self.neighbors, self.trail
+        trail.extend((flat_index * 2, parent[flat_index], flat_index * 2 + 1, size[flat_index]))
+        parent[flat_index] = flat_index
+        size[flat_index] = 1
+        root = flat_index
+        for k in range(self.offsets[flat_index], self.offsets[flat_index + 1]):
+            neighbor_flat_index = neighbors[k]
+            if parent[neighbor_flat_index] == -1: continue
+            other = self.find(neighbor_flat_index)
+            if other == root: continue
+            if size[other] > size[root]:
+                root, other = other, root
+            trail.extend((other * 2, parent[other], root * 2 + 1, size[root]))
+            parent[other] = root
+            size[root] += size[other]
+        return size[root]
+
+    def group_size(self, flat_index):
+        if self.parent[flat_index] == -1: return 0
+        return self.size[self.find(flat_index)]
+
+    def mark(self):
+        return self.generation, len(self.trail)
+
+    def rollback(self, mark, flat_index):
+        """mark 이후 추가한 flat_index 돌을 되감아 제거합니다. (추가할 때 쓴 만큼의 비용)"""
+        generation, length = mark
+        if generation != self.generation:
+            self.remove(flat_index)  # 중간에 rebuild 되었으면 다시 만듭니다
+            return
+        parent, size, trail = self.parent, self.size, self.trail
+        while len(trail) > length:
+            old_value = trail.pop()
+            slot, kind = divmod(trail.pop(), 2)
+            if kind: size[slot] = old_value
+            else: parent[slot] = old_value
+
+    def remove(self, flat_index):
+        """돌을 제거합니다. 그룹이 나뉠 수 있으므로 남은 돌로 다시 만듭니다."""
+        if self.parent[flat_index] == -1: return
+        remaining = [i for i, p in enumerate(self.parent) if p != -1 and i != flat_index]
+        self.rebuild(remaining)
+
+    def rebuild(self, flat_indices):
+        total_spots = len(self.parent)
+        self.parent = array('i', [-1]) * total_spots
+        self.size = array('i', [0]) * total_spots
+        self.trail = array('i')
+        self.generation += 1
+        for flat_index in flat_indices:
+            self.add(flat_index)
+
+    def copy(self):
+        other = ConnectivityTracker.__new__(ConnectivityTracker)
+        other.offsets, other.neighbors = self.offsets, self.neighbors
+        other.parent = array('i', self.parent)
+        other.size = array('i', self.size)
+        other.trail = array('i', self.trail)
+        other.generation = self.generation
+        return other
+
+# ----------------------------------------------------------------------
+# 게임판 구조 (격자 크기별 꼭짓점/인접 정보)
+# ----------------------------------------------------------------------
+class HexBoard:
+    """N x N 육각형 격자의 구조(부분 도형, 꼭짓점 공유, 인접 리스트)를 보관합니다."""
+
+    def __init__(self, grid_size=DEFAULT_GRID_SIZE, adjacency_source=None):
+        self.grid_size = grid_size
+        self.rows = grid_size
+        self.cols = grid_size
+        self.total_spots = self.rows * self.cols * TOTAL_PARTS_PER_HEX
+        # adjacency_source(grid_size, win_type) -> CSR. 없으면 직접 계산합니다. (topocache 참고)
+        self._adjacency_source = adjacency_source
+        self._vertex_to_parts_map = None
+        self.adjacency_csr = {}
+        self._adjacency = {}
+        self._neighbor_masks = {}
+        self.full_mask = (1 << self.total_spots) - 1
+
+    @property
+    def vertex_to_parts_map(self):
+        if self._vertex_to_parts_map is None:
+            self._vertex_to_parts_map = build_vertex_to_parts_map(self.rows, self.cols)
+        return self._vertex_to_parts_map
+
+    def flat_to_coords(self, flat_index):
+        return flat_to_coords(flat_index, self.rows, self.cols)
+
+    def coords_to_flat(self, row, col, part_index):
+        return coords_to_flat(row, col, part_index, self.rows, self.cols)
+
+    def csr(self, win_type):
+        """승리 타입별 CSR 인접 정보 (offsets, neighbors)."""
+        if win_type not in self.adjacency_csr:
+            if self._adjacency_source is not None:
+                self.adjacency_csr[win_type] = self._adjacency_source(self.grid_size, win_type)
+            else:
+                # 세 승리 타입은 한 번의 순회로 함께 만들어집니다.
+                self.adjacency_csr.update(build_adjacency_csr(self.vertex_to_parts_map, self.total_spots))
+        return self.adjacency_csr[win_type]
+
+    def adjacency(self, win_type):
+        """승리 타입별 인접 리스트 (CSR에서 처음 요청할 때 펼침)."""
+        if win_type not in self._adjacency:
+            self._adjacency[win_type] = csr_to_lists(self.csr(win_type))
+        return self._adjacency[win_type]
+
+    def neighbor_masks(self, win_type):
+        """승리 타입별 칸 이웃 비트마스크 (처음 요청할 때 계산)."""
+        if win_type not in self._neighbor_masks:
+            if self.total_spots > NEIGHBOR_MASK_PRECOMPUTE_LIMIT:
+                self._neighbor_masks[win_type] = LazyNeighborMasks(self.csr(win_type))
+            else:
+                self._neighbor_masks[win_type] = build_neighbor_masks(self.csr(win_type))
+        return self._neighbor_masks[win_type]
+
+    def neighbors(self, win_type, flat_index):
+        offsets, neighbors = self.csr(win_type)
+        return neighbors[offsets[flat_index]:offsets[flat_index + 1]]
+
+# ----------------------------------------------------------------------
+# 게임 상태 (보드, 차례, 승리/무승부 판정)
+# ----------------------------------------------------------------------
+class GameState:
+    """한 판의 게임 상태. 설정 검증, 착수, 수정 모드 지우기, 승리/무승부 판정을 담당합니다."""
+
+    def __init__(self, grid_size=DEFAULT_GRID_SIZE, num_players=DEFAULT_NUM_PLAYERS,
+                 min_win_length=DEFAULT_WINNING_LENGTH, winning_type=DEFAULT_WINNING_TYPE, hex_board=None):
+        if not MIN_GRID_SIZE <= grid_size <= MAX_GRID_SIZE: raise ValueError(f"크기 {MIN_GRID_SIZE}~{MAX_GRID_SIZE} 선택")
+        if not 2 <= num_players <= len(DEFAULT_PLAYERS): raise ValueError(f"인원 2~{len(DEFAULT_PLAYERS)} 선택")
+        total_spots = grid_size * grid_size * TOTAL_PARTS_PER_HEX
+        if not MIN_WINNING_LENGTH <= min_win_length <= total_spots: raise ValueError(f"승리 길이는 {MIN_WINNING_LENGTH}~{total_spots} 사이")
+        if winning_type not in WINNING_TYPE_OPTIONS: raise ValueError("잘못된 승리 타입")
+        if hex_board is not None and hex_board.grid_size != grid_size: raise ValueError("격자 크기가 게임판과 다릅니다")
+
+        self.hex_board = hex_board if hex_board is not None else HexBoard(grid_size)
+        self.grid_size = grid_size
+        self.total_spots = total_spots
+        self.num_players = num_players
+        self.players = DEFAULT_PLAYERS[:num_players]
+        self.min_win_length = min_win_length
+        self.winning_type = winning_type
+        self.board = [EMPTY] * total_spots
+        # 비트보드: 플레이어별 돌 마스크와 전체 점유 마스크 (board 리스트와 함께 갱신)
+        self.player_masks = {p: 0 for p in self.players}
+        self.occupied = 0
+        self.current_player_index = 0
+        self.game_active = True
+        self.first_move = True  # 첫 번째 수는 '면 모드' 인접으로 승리 판정
+        self.winner = None
+        self.last_move = None
+        # 기보: (종류, flat index, 플레이어 번호, 되돌리기 정보). history_position 뒤의 항목은 다시 하기용
+        self.history = []
+        self.history_position = 0
+
+        win_csr = self.hex_board.csr(winning_type)
+        self.connectivity = {p: ConnectivityTracker(total_spots, win_csr) for p in self.players}
+        self.threats = ThreatIndex(win_csr, num_players, min_win_length)
+
+    @property
+    def current_player(self):
+        return self.players[self.current_player_index]
+
+    def empty_mask(self):
+        return self.hex_board.full_mask & ~self.occupied
+
+    def available_moves(self):
+        return list(iter_bits(self.empty_mask()))
+
+    def available_move_count(self):
+        return self.total_spots - popcount(self.occupied)
+
+    def is_draw(self):
+        return self.occupied == self.hex_board.full_mask
+
+    def winning_moves(self, player=None):
+        """player(기본: 현재 플레이어)가 두면 바로 이기는 빈 칸 목록."""
+        player_index = self.current_player_index if player is None else self.players.index(player)
+        return list(iter_bits(self.threats.masks[player_index]))
+
+    def blocking_moves(self):
+        """다른 플레이어가 다음 차례에 두면 이기는 빈 칸 목록 (막아야 할 칸)."""
+        mask = 0
+        for player_index, threat_mask in enumerate(self.threats.masks):
+            if player_index != self.current_player_index: mask |= threat_mask
+        return list(iter_bits(mask))
+
+    @instrumented('play')
+    def play(self, flat_index):
+        """현재 플레이어의 돌을 놓고 승자(없으면 None)를 반환합니다."""
+        if not self.game_active: raise ValueError("게임이 끝났습니다")
+        if not 0 <= flat_index < self.total_spots or self.board[flat_index] != EMPTY: raise ValueError("놓을 수 없는 칸")
+        entry = self._place(flat_index)
+        self._record(entry)
+        return self.winner
+
+    def clear(self, flat_index):
+        """수정 모드: 칸을 비웁니다. 차례나 승리/무승부는 바꾸지 않습니다."""
+        if self.board[flat_index] == EMPTY: return False
+        self._record(self._clear(flat_index))
+        return True
+
+    def undo(self):
+        """마지막 기보 항목을 되돌리고 그 칸의 flat index를 반환합니다. (없으면 None)"""
+        if self.history_position == 0: return None
+        self.history_position -= 1
+        action, flat_index, player_index, undo_info = self.history[self.history_position]
+        player = self.players[player_index]
+        bit = 1 << flat_index
+        if action == MOVE_PLACE:
+            mark, self.first_move, self.last_move, threat_info = undo_info
+            self.board[flat_index] = EMPTY
+            self.player_masks[player] &= ~bit
+            self.occupied &= ~bit
+            self.connectivity[player].rollback(mark, flat_index)
+            self.threats.restore(threat_info)
+            self.current_player_index = player_index
+            self.winner = None
+            self.game_active = True
+        else:
+            self.board[flat_index] = player
+            self.player_masks[player] |= bit
+            self.occupied |= bit
+            self.connectivity[player].add(flat_index)
+            self.threats.place(player_index, flat_index)
+        return flat_index
+
+    def redo(self):
+        """되돌린 기보 항목을 다시 적용하고 그 칸의 flat index를 반환합니다. (없으면 None)"""
+        if self.history_position == len(self.history): return None
+        action, flat_index, _, _ = self.history[self.history_position]
+        entry = self._place(flat_index) if action == MOVE_PLACE else self._clear(flat_index)
+        self.history[self.history_position] = entry
+        self.history_position += 1
+        return flat_index
+
+    def applied_moves(self):
+        """지금까지 적용된 (종류, flat index) 목록 (되돌린 항목 제외)."""
+        return [(action, flat_index) for action, flat_index, _, _ in self.history[:self.history_position]]
+
+    def _record(self, entry):
+        # 새 수를 두면 다시 하기 목록은 버립니다.
+        del self.history[self.history_position:]
+        self.history.append(entry)
+        self.history_position += 1
+
+    def _place(self, flat_index):
+        player_index = self.current_player_index
+        player = self.players[player_index]
+        tracker = self.connectivity[player]
+        mark, first_move, last_move = tracker.mark(), self.first_move, self.last_move
+
+        self.board[flat_index] = player
+        bit = 1 << flat_index
+        self.player_masks[player] |= bit
+        self.occupied |= bit
+        self.last_move = flat_index
+        winner, threat_info = self._check_win(player_index, flat_index)
+        entry = (MOVE_PLACE, flat_index, player_index, (mark, first_move, last_move, threat_info))
+        self.first_move = False
+
+        if winner:
+            self.winner = winner
+            self.game_active = False
+        elif self.is_draw():
+            self.game_active = False
+        else:
+            self.next_player()
+        return entry
+
+    @instrumented('win_check')
+    def _check_win(self, player_index, flat_index):
+        """놓은 돌을 연결 그룹과 이기는 칸 색인에 반영하고 (승자 또는 None, 색인 되돌리기 정보)를 반환합니다."""
+        player = self.players[player_index]
+        group_size = self.connectivity[player].add(flat_index)
+        threat_info = self.threats.place(player_index, flat_index)
+        if self.first_move:
+            # 첫 수는 면 인접 기준으로 판정합니다. (보드가 거의 비어 있어 탐색 비용이 작음)
+            first_move_masks = self.hex_board.neighbor_masks(WINNING_TYPE_EDGE_ONLY)
+            won = group_size_at_least(self.player_masks[player], flat_index, first_move_masks, self.min_win_length)
+        else:
+            won = group_size >= self.min_win_length
+        return (player if won else None), threat_info
+
+    def _clear(self, flat_index):
+        player = self.board[flat_index]
+        self.board[flat_index] = EMPTY
+        bit = 1 << flat_index
+        self.player_masks[player] &= ~bit
+        self.occupied &= ~bit
+        self.connectivity[player].remove(flat_index)
+        self.threats.rebuild([self.player_masks[p] for p in self.players])
+        return (MOVE_CLEAR, flat_index, self.players.index(player), None)
+
+    def next_player(self):
+        self.current_player_index = (self.current_player_index + 1) % self.num_players
+
+    def copy(self):
+        """독립적으로 바꿀 수 있는 복사본 (격자 구조는 공유). AI 스레드에 넘길 때 사용합니다."""
+        other = GameState.__new__(GameState)
+        other.__dict__.update(self.__dict__)
+        other.board = self.board[:]
+        other.history = self.history[:]
+        other.player_masks = dict(self.player_masks)
+        other.connectivity = {p: tracker.copy() for p, tracker in self.connectivity.items()}
+        other.threats = self.threats.copy()
+        return other
@@ -0,0 +1,200 @@
+"""몬테카를로 트리 탐색(UCT) 컴퓨터 플레이어.
+
+큰 격자나 4인 게임처럼 전체 탐색이 어려운 설정을 위한 플레이어입니다.
+플레이아웃은 빈 칸을 무작위 순서로 채우며, 매 수마다 비트마스크 flood fill로
+(승리 길이에 닿으면 바로 멈추는) 가벼운 승리 판정을 합니다.
+workers가 2 이상이면 ProcessPoolExecutor로 프로세스마다 독립된 트리를 키운 뒤
+루트 자식의 방문 수를 합치는 루트 병렬화를 사용합니다.
+"""
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from hexengine import WINNING_TYPE_EDGE_ONLY, HexBoard, iter_bits, group_size_at_least
+from hexstats import instrumented
+
+DEFAULT_SIMULATIONS = 2000
+DEFAULT_TIME_LIMIT = 1.0  # 한 수당 탐색 시간 (초)
+DEFAULT_EXPLORATION = 1.0  # UCT 탐험 상수
+TIME_CHECK_INTERVAL = 16  # 시뮬레이션 몇 번마다 시간을 확인할지
+TIME_CHECK_SPOTS = 2048  # 칸이 이보다 많은 판은 시뮬레이션이 느리므로 더 자주 확인
+DRAW = -1
+
+_hex_boards = {}  # 작업 프로세스별 격자 구조 캐시
+
+
+def _hex_board(grid_size):
+    if grid_size not in _hex_boards:
+        _hex_boards[grid_size] = HexBoard(grid_size)
+    return _hex_boards[grid_size]
+
+
+class _Node:
+    __slots__ = ('move', 'parent', 'mover', 'children', 'untried', 'visits', 'reward', 'winner')
+
+    def __init__(self, move, parent, mover, untried, winner=None):
+        self.move = move
+        self.parent = parent
+        self.mover = mover  # 이 노드로 오는 수를 둔 플레이어
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.reward = 0.0  # mover 입장에서 받은 보상 합
+        self.winner = winner  # 끝난 국면이면 승자 번호 또는 DRAW
+
+
+class _Playout:
+    """한 번의 선택-확장-시뮬레이션 동안 바뀌는 비트마스크 국면."""
+    __slots__ = ('player_masks', 'empty', 'to_move', 'first_move')
+
+    def __init__(self, player_masks, empty, to_move, first_move):
+        self.player_masks = list(player_masks)
+        self.empty = empty
+        self.to_move = to_move
+        self.first_move = first_move
+
+
+def run_search(spec, simulations, time_limit, seed, exploration=DEFAULT_EXPLORATION, cancel_event=None):
+    """UCT 트리를 키우고 루트 자식별 {수: (방문 수, 보상 합)}을 반환합니다. (작업 프로세스에서 실행)"""
+    grid_size, num_players, min_win_length, winning_type, player_masks, to_move, first_move = spec
+    hex_board = _hex_board(grid_size)
+    win_masks = hex_board.neighbor_masks(winning_type)
+    first_move_masks = hex_board.neighbor_masks(WINNING_TYPE_EDGE_ONLY)
+    root_empty = hex_board.full_mask
+    for mask in player_masks:
+        root_empty &= ~mask
+    rng = random.Random(seed)
+    draw_reward = 1.0 / num_players
+    root_cells = list(iter_bits(root_empty))
+    time_check_interval = max(1, min(TIME_CHECK_INTERVAL, TIME_CHECK_SPOTS // hex_board.total_spots))
+
+    def play(state, flat_index):
+        player = state.to_move
+        state.player_masks[player] |= 1 << flat_index
+        state.empty &= ~(1 << flat_index)
+        # 첫 수는 면 인접으로 승리를 판정합니다.
+        neighbor_masks = first_move_masks if state.first_move else win_masks
+        state.first_move = False
+        state.to_move = (player + 1) % num_players
+        return group_size_at_least(state.player_masks[player], flat_index, neighbor_masks, min_win_length)
+
+    def rollout(state):
+        # 루트의 빈 칸을 두는 만큼만 섞습니다. (큰 판에서는 승부가 난 뒤의 칸은 섞지 않음)
+        cells = root_cells[:]
+        count = len(cells)
+        tree_moves = set(iter_bits(root_empty & ~state.empty))  # 선택/확장 단계에서 이미 둔 칸
+        randrange = rng.randrange
+        for i in range(count):
+            j = randrange(i, count)
+            cells[i], cells[j] = cells[j], cells[i]
+            flat_index = cells[i]
+            if flat_index in tree_moves: continue
+            player = state.to_move
+            if play(state, flat_index): return player
+        return DRAW
+
+    root = _Node(None, None, (to_move - 1) % num_players, root_cells[:])
+    deadline = time.monotonic() + time_limit
+    log = math.log
+    sqrt = math.sqrt
+    for simulation in range(simulations):
+        if simulation % time_check_interval == 0:
+            if time.monotonic() > deadline or (cancel_event is not None and cancel_event.is_set()): break
+        state = _Playout(player_masks, root_empty, to_move, first_move)
+        node = root
+
+        # 1. 선택: 모든 자식이 펼쳐진 노드에서 UCT 값이 가장 큰 자식으로 내려갑니다.
+        while not node.untried and node.children and node.winner is None:
+            log_visits = log(node.visits)
+            node = max(node.children, key=lambda child: child.reward / child.visits
+                       + exploration * sqrt(log_visits / child.visits))
+            play(state, node.move)
+
+        # 2. 확장
+        if node.winner is None and node.untried:
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            mover = state.to_move
+            won = play(state, move)
+            winner = mover if won else (DRAW if not state.empty else None)
+            child = _Node(move, node, mover, list(iter_bits(state.empty)) if winner is None else [], winner)
+            node.children.append(child)
+            node = child
+
+        # 3. 시뮬레이션
+        winner = node.winner if node.winner is not None else rollout(state)
+
+        # 4. 역전파
+        while node is not None:
+            node.visits += 1
+            if winner == DRAW: node.reward += draw_reward
+            elif winner == node.mover: node.reward += 1.0
+            node = node.parent
+
+    return {child.move: (child.visits, child.reward) for child in root.children}
+
+
+class MCTSPlayer:
+    """UCT로 수를 고르는 컴퓨터 플레이어. workers > 1이면 프로세스 풀에서 루트 병렬 탐색."""
+
+    def __init__(self, simulations=DEFAULT_SIMULATIONS, time_limit=DEFAULT_TIME_LIMIT, workers=1,
+                 exploration=DEFAULT_EXPLORATION, seed=None, book=None):
+        if simulations < 1: raise ValueError("시뮬레이션 수는 1 이상")
+        if workers < 1: raise ValueError("작업 프로세스 수는 1 이상")
+        self.simulations = simulations
+        self.time_limit = time_limit
+        self.workers = workers
+        self.exploration = exploration
+        self.book = book  # 오프닝 북 (hexbook.OpeningBook)
+        self.rng = random.Random(seed)
+        self._executor = None
+        self.last_stats = {}
+
+    @instrumented('ai_search_mcts')
+    def choose_move(self, game, cancel_event=None):
+        """game(GameState)의 현재 플레이어가 둘 수를 반환합니다.
+
+        cancel_event는 한 프로세스로 탐색할 때만 확인합니다. (병렬 탐색은 time_limit으로 끝남)
+        """
+        moves = game.available_moves()
+        if not moves: raise ValueError("둘 수 있는 칸이 없습니다")
+        if len(moves) == 1: return moves[0]
+        if self.book is not None:
+            book_move = self.book.lookup(game)
+            if book_move is not None: return book_move
+
+        spec = (game.grid_size, game.num_players, game.min_win_length, game.winning_type,
+                [game.player_masks[p] for p in game.players], game.current_player_index, game.first_move)
+        seeds = [self.rng.getrandbits(64) for _ in range(self.workers)]
+        if self.workers == 1:
+            _hex_boards.setdefault(game.grid_size, game.hex_board)  # 같은 프로세스면 게임의 격자 구조를 그대로 씀
+            results = [run_search(spec, self.simulations, self.time_limit, seeds[0], self.exploration, cancel_event)]
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            share, remainder = divmod(self.simulations, self.workers)
+            futures = [self._executor.submit(run_search, spec, share + (1 if i < remainder else 0),
+                                             self.time_limit, seeds[i], self.exploration)
+                       for i in range(self.workers)]
+            results = [future.result() for future in futures]
+
+        # 루트 병렬화: 작업별 방문 수와 보상을 합친 뒤 가장 많이 방문한 수를 고릅니다.
+        stats = {}
+        for result in results:
+            for move, (visits, reward) in result.items():
+                total_visits, total_reward = stats.get(move, (0, 0.0))
+                stats[move] = (total_visits + visits, total_reward + reward)
+        self.last_stats = stats
+        if not stats: return moves[0]
+        return max(stats, key=lambda move: (stats[move][0], stats[move][1]))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,201 @@
+"""육각형 격자 캔버스 렌더러.
+
+육각형 꼭짓점의 단위 오프셋(cos/sin)은 모듈을 불러올 때 한 번만 계산합니다.
+격자 크기와 위치가 같으면 기존 polygon 아이템을 다시 쓰고 색만 되돌리며,
+색 변경은 모아 두었다가 실제로 바뀐 칸만 itemconfig 합니다.
+큰 판(최대 200x200)을 위해 아이템은 보이는 영역의 육각형만 만들고, 영역을 벗어나면 지웁니다.
+"""
+import math
+
+from hexengine import TOTAL_PARTS_PER_HEX, PART_VERTEX_INDICES, EMPTY
+from hexstats import instrumented
+
+SQRT3 = math.sqrt(3)
+HEX_VERTEX_ANGLES = [90, 30, -30, -90, -150, 150]  # pointy top 기준
+UNIT_HEX_VERTICES = [(math.cos(math.radians(a)), math.sin(math.radians(a))) for a in HEX_VERTEX_ANGLES] + [(0.0, 0.0)]
+EMPTY_FILL = "lightgray"
+PART_TAG = "hex_part"
+BULK_RESET_RATIO = 0.25  # 바뀐 칸이 이 비율보다 많으면 태그 하나로 한 번에 되돌림
+
+
+def hex_center(row, col, size, offset_x=0.0, offset_y=0.0):
+    """(row, col) 육각형의 중심 좌표 (staggered layout, q = col - floor(row/2))."""
+    q = col - row // 2
+    return offset_x + size * SQRT3 * (q + row / 2.0), offset_y + size * 1.5 * row
+
+
+def part_polygon(row, col, part_index, size, offset_x=0.0, offset_y=0.0):
+    """부분 도형(0/1/2)의 꼭짓점 좌표 리스트 [x0, y0, x1, y1, ...]."""
+    cx, cy = hex_center(row, col, size, offset_x, offset_y)
+    coords = []
+    for v_idx in PART_VERTEX_INDICES[part_index]:
+        vx, vy = UNIT_HEX_VERTICES[v_idx]
+        coords.append(cx + size * vx)
+        coords.append(cy + size * vy)
+    return coords
+
+
+def axial_round(q_f, r_f):
+    """실수 axial 좌표를 가장 가까운 육각형의 정수 axial 좌표로 반올림합니다. (cube 좌표 반올림)"""
+    x, z = q_f, r_f
+    y = -x - z
+    rx, ry, rz = round(x), round(y), round(z)
+    dx, dy, dz = abs(rx - x), abs(ry - y), abs(rz - z)
+    if dx > dy and dx > dz:
+        rx = -ry - rz
+    elif dy > dz:
+        ry = -rx - rz
+    else:
+        rz = -rx - ry
+    return rx, rz
+
+
+def pixel_to_flat(x, y, rows, cols, size, offset_x=0.0, offset_y=0.0):
+    """화면 좌표 -> 부분 도형 flat index (격자 밖이면 None). 격자 크기와 상관없이 O(1)."""
+    px = (x - offset_x) / size
+    py = (y - offset_y) / size
+    q, r = axial_round(SQRT3 / 3.0 * px - py / 3.0, 2.0 / 3.0 * py)
+    row, col = r, q + r // 2
+    if not (0 <= row < rows and 0 <= col < cols): return None
+
+    # 중심에서 본 각도로 부분 도형을 고릅니다. (0: -30~90도, 1: -150~-30도, 2: 나머지)
+    cx, cy = hex_center(row, col, size, offset_x, offset_y)
+    angle = math.degrees(math.atan2(y - cy, x - cx))
+    if -30.0 <= angle < 90.0: part_index = 0
+    elif -150.0 <= angle < -30.0: part_index = 1
+    else: part_index = 2
+    return (row * cols + col) * TOTAL_PARTS_PER_HEX + part_index
+
+
+def visible_hex_range(x0, y0, x1, y1, rows, cols, size, offset_x=0.0, offset_y=0.0):
+    """캔버스 영역 (x0, y0)-(x1, y1)에 걸치는 육각형의 (첫 행, 끝 행, 첫 열, 끝 열). 끝은 포함하지 않습니다."""
+    row_step = 1.5 * size
+    col_step = SQRT3 * size
+    first_row = max(0, math.floor((y0 - offset_y - size) / row_step))
+    last_row = min(rows, math.ceil((y1 - offset_y + size) / row_step) + 1)
+    # 홀수 행은 반 칸 밀려 있으므로 한 칸씩 여유를 둡니다.
+    first_col = max(0, math.floor((x0 - offset_x) / col_step) - 1)
+    last_col = min(cols, math.ceil((x1 - offset_x) / col_step) + 1)
+    return first_row, max(first_row, last_row), first_col, max(first_col, last_col)
+
+
+class HexRenderer:
+    """캔버스 위의 부분 도형 polygon 아이템과 색을 관리합니다.
+
+    칸 색은 fills에 모두 기억하고, 아이템은 show_region()으로 알려 준 영역의 육각형만 만듭니다.
+    """
+
+    def __init__(self, canvas, hex_size, empty_fill=EMPTY_FILL):
+        self.canvas = canvas
+        self.hex_size = hex_size
+        self.empty_fill = empty_fill
+        self._layout = None
+        self._region = None  # 아이템을 만든 육각형 범위 (visible_hex_range)
+        self.index_to_item = {}  # 아이템이 만들어진 칸만
+        self.fills = []  # 칸별 색 (아이템이 없는 칸 포함)
+        self._pending = {}  # flush 전에 모아 둔 색 변경 {flat_index: color}
+
+    @instrumented('render_layout')
+    def layout(self, rows, cols, offset_x, offset_y):
+        """격자를 준비합니다. 같은 배치면 아이템을 다시 쓰고 True를 반환합니다.
+
+        아이템은 show_region()을 부를 때 그 영역만큼 만듭니다.
+        """
+        new_layout = (rows, cols, offset_x, offset_y)
+        if new_layout == self._layout:
+            self.reset()
+            return True
+
+        self.clear()
+        self._layout = new_layout
+        self.fills = [self.empty_fill] * (rows * cols * TOTAL_PARTS_PER_HEX)
+        return False
+
+    def rescale(self, hex_size, offset_x, offset_y):
+        """확대/축소: 칸 색은 그대로 두고 아이템을 지웁니다. (다음 show_region에서 새 크기로 만듦)"""
+        if self._layout is None: return
+        self._delete_items()
+        self.hex_size = hex_size
+        rows, cols, _, _ = self._layout
+        self._layout = (rows, cols, offset_x, offset_y)
+
+    @instrumented('render_region')
+    def show_region(self, x0, y0, x1, y1):
+        """캔버스 영역 안의 육각형만 아이템이 있도록 만들고, 벗어난 아이템은 지웁니다."""
+        if self._layout is None: return
+        rows, cols, offset_x, offset_y = self._layout
+        region = visible_hex_range(x0, y0, x1, y1, rows, cols, self.hex_size, offset_x, offset_y)
+        if region == self._region: return
+        first_row, last_row, first_col, last_col = region
+        canvas = self.canvas
+
+        for flat_index in list(self.index_to_item):
+            row, col = divmod(flat_index // TOTAL_PARTS_PER_HEX, cols)
+            if not (first_row <= row < last_row and first_col <= col < last_col):
+                canvas.delete(self.index_to_item.pop(flat_index))
+
+        size, fills = self.hex_size, self.fills
+        created = False
+        for row in range(first_row, last_row):
+            for col in range(first_col, last_col):
+                base = (row * cols + col) * TOTAL_PARTS_PER_HEX
+                if base in self.index_to_item: continue
+                for part_index in range(TOTAL_PARTS_PER_HEX):
+                    flat_index = base + part_index
+                    self.index_to_item[flat_index] = canvas.create_polygon(
+                        part_polygon(row, col, part_index, size, offset_x, offset_y),
+                        outline="black", fill=fills[flat_index], width=1, tags=PART_TAG)
+                created = True
+        if created: canvas.tag_lower(PART_TAG)  # 남은 수 표시 등 다른 아이템 아래에 둠
+        self._region = region
+
+    def _delete_items(self):
+        self.canvas.delete(PART_TAG)
+        self.index_to_item = {}
+        self._region = None
+
+    def clear(self):
+        """모든 부분 도형 아이템을 지웁니다."""
+        self._delete_items()
+        self._layout = None
+        self.fills = []
+        self._pending = {}
+
+    def reset(self):
+        """모든 칸을 빈 칸 색으로 되돌립니다. (칠해진 칸만 갱신)"""
+        self._pending = {}
+        painted = [i for i, fill in enumerate(self.fills) if fill != self.empty_fill]
+        if len(painted) > BULK_RESET_RATIO * len(self.index_to_item):
+            self.canvas.itemconfig(PART_TAG, fill=self.empty_fill)
+        else:
+            for flat_index in painted:
+                item_id = self.index_to_item.get(flat_index)
+                if item_id is not None: self.canvas.itemconfig(item_id, fill=self.empty_fill)
+        self.fills = [self.empty_fill] * len(self.fills)
+
+    def set_fill(self, flat_index, color):
+        """칸 색 변경을 예약합니다. flush()에서 실제로 칠합니다."""
+        self._pending[flat_index] = color
+
+    def sync(self, board, player_colors):
+        """board와 화면이 다른 칸만 예약합니다. (되돌리기, 기보 재생 등 여러 칸이 바뀔 때)"""
+        for flat_index, mark in enumerate(board):
+            color = self.empty_fill if mark == EMPTY else player_colors[mark]
+            if self.fills[flat_index] != color:
+                self._pending[flat_index] = color
+
+    @instrumented('render_flush')
+    def flush(self):
+        """예약된 색 중 실제로 바뀐 칸만 다시 칠합니다."""
+        pending, self._pending = self._pending, {}
+        for flat_index, color in pending.items():
+            if self.fills[flat_index] == color: continue
+            self.fills[flat_index] = color
+            item_id = self.index_to_item.get(flat_index)
+            if item_id is not None: self.canvas.itemconfig(item_id, fill=color)
+
+    def hit_test(self, x, y):
+        """캔버스 좌표에 있는 부분 도형의 flat index (없으면 None)."""
+        if self._layout is None: return None
+        rows, cols, offset_x, offset_y = self._layout
+        return pixel_to_flat(x, y, rows, cols, self.hex_size, offset_x, offset_y)
@@ -0,0 +1,302 @@
+"""여러 판을 동시에 진행하는 asyncio 게임 서버 (줄 단위 JSON 프로토콜).
+
+예) python hexserver.py --port 8765
+    python hexserver.py --unix /tmp/hexttt.sock
+    python tictactoe.py --connect 127.0.0.1:8765 [--game 3 --seat P2]
+
+요청은 한 줄에 JSON 하나이고, "id"를 넣으면 응답에 그대로 돌려줍니다.
+    {"op": "create", "grid_size": 3, "players": 4, "win_length": 3, "win_type": "일반 모드", "seats": ["P1"]}
+    {"op": "join", "game": 1, "seats": ["P2"]}       (seats가 비어 있으면 관전)
+    {"op": "play", "game": 1, "move": 13}
+    {"op": "state", "game": 1} / {"op": "leave", "game": 1} / {"op": "list"}
+응답은 {"id", "ok": true, ...} 또는 {"id", "ok": false, "error"}이고, 참여한 판에서 수가 놓이면
+{"event": "update", "game", "moves": [[flat, 플레이어], ...], "current_player", "winner", "active"}가
+BATCH_INTERVAL마다 판별로 모아서 한 번에 전달됩니다.
+같은 설정의 판들은 TopologyCache로 격자 구조를 함께 씁니다.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from hexengine import (
+    DEFAULT_GRID_SIZE, DEFAULT_NUM_PLAYERS, DEFAULT_WINNING_LENGTH, DEFAULT_WINNING_TYPE,
+    MIN_GRID_SIZE, MAX_GRID_SIZE, WIN_TYPE_ALIASES, GameState,
+)
+from topocache import TopologyCache
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+BATCH_INTERVAL = 0.02  # 수 알림을 모아 보내는 주기 (초)
+MAX_LINE_BYTES = 64 * 1024
+MAX_OUTPUT_BUFFER_BYTES = 1024 * 1024  # 읽지 않고 쌓인 출력이 이보다 많으면 느린 클라이언트로 보고 끊음
+
+
+class ProtocolError(Exception):
+    """잘못된 요청 (응답의 error로 돌려줌)."""
+
+
+def game_state_message(server_game):
+    """판 전체 상태 (처음 참여할 때, state 요청). 보드는 기보로 전달하고 클라이언트가 재생합니다."""
+    game = server_game.game
+    return {
+        'game': server_game.game_id,
+        'grid_size': game.grid_size,
+        'players': game.num_players,
+        'win_length': game.min_win_length,
+        'win_type': game.winning_type,
+        'moves': [[flat_index, game.board[flat_index]] for _, flat_index in game.applied_moves()],
+        'current_player': game.current_player,
+        'winner': game.winner,
+        'active': game.game_active,
+        'seats': {player: connection.name for player, connection in server_game.seats.items()},
+    }
+
+
+def int_field(request, name, default):
+    """요청의 정수 필드. JSON 실수(1e400, Infinity 등)나 true/false는 받지 않습니다."""
+    value = request.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, int): raise ProtocolError(f"{name}는 정수여야 합니다")
+    return value
+
+
+class ServerGame:
+    """서버가 진행하는 한 판: 게임 상태, 자리 주인, 구독 연결, 아직 보내지 않은 수."""
+
+    def __init__(self, game_id, game):
+        self.game_id = game_id
+        self.game = game
+        self.seats = {}  # 플레이어 -> Connection
+        self.subscribers = set()
+        self.pending_moves = []  # [[flat index, 플레이어], ...] 다음 일괄 전송까지 모아 둠
+
+
+class Connection:
+    """클라이언트 연결 하나. 보낼 줄을 모아 두었다가 한 번에 씁니다."""
+
+    def __init__(self, server, writer, name):
+        self.server = server
+        self.writer = writer
+        self.name = name
+        self.games = set()  # 참여 중인 판 번호
+        self._outgoing = []
+
+    def queue(self, message):
+        self._outgoing.append(json.dumps(message, ensure_ascii=False))
+
+    def send(self, message):
+        self.queue(message)
+        self.server.schedule_flush(self)
+
+    def flush(self):
+        if not self._outgoing or self.writer.is_closing(): return
+        self.writer.write(('\n'.join(self._outgoing) + '\n').encode('utf-8'))
+        self._outgoing = []
+        transport = self.writer.transport
+        if transport.get_write_buffer_size() > MAX_OUTPUT_BUFFER_BYTES:
+            # 보낸 알림을 읽지 않는 연결: 버퍼가 끝없이 커지지 않도록 끊습니다. (handle_client가 정리)
+            transport.abort()
+
+
+class HexServer:
+    """게임 목록과 연결을 관리하고 요청을 처리합니다."""
+
+    def __init__(self, topology_cache=None, batch_interval=BATCH_INTERVAL):
+        self.topology_cache = topology_cache if topology_cache is not None else TopologyCache()
+        self.batch_interval = batch_interval
+        self.games = {}
+        self._next_game_id = 1
+        self._next_connection_id = 1
+        self._dirty_games = set()
+        self._dirty_connections = set()
+        self._flush_handle = None
+
+    # ------------------------------------------------------------------
+    # 연결 처리
+    # ------------------------------------------------------------------
+    async def handle_client(self, reader, writer):
+        connection = Connection(self, writer, f"c{self._next_connection_id}")
+        self._next_connection_id += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+                    break
+                if not line: break
+                if line.strip():
+                    self.handle_line(connection, line)
+                await writer.drain()
+        finally:
+            self.disconnect(connection)
+            writer.close()
+
+    def handle_line(self, connection, line):
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except (ValueError, RecursionError):  # RecursionError: 너무 깊게 중첩된 JSON
+                raise ProtocolError("JSON 형식이 아닙니다")
+            if not isinstance(request, dict): raise ProtocolError("요청은 JSON 객체여야 합니다")
+            request_id = request.get('id')
+            handler = self.HANDLERS.get(request.get('op'))
+            if handler is None: raise ProtocolError(f"알 수 없는 요청: {request.get('op')}")
+            reply = handler(self, connection, request)
+            reply['ok'] = True
+        except (ProtocolError, ValueError, TypeError) as e:
+            reply = {'ok': False, 'error': str(e)}
+        if request_id is not None: reply['id'] = request_id
+        connection.send(reply)
+
+    def disconnect(self, connection):
+        for game_id in list(connection.games):
+            self._leave(connection, self.games.get(game_id))
+        self._dirty_connections.discard(connection)
+
+    # ------------------------------------------------------------------
+    # 요청 처리
+    # ------------------------------------------------------------------
+    def _server_game(self, request):
+        server_game = self.games.get(request.get('game'))
+        if server_game is None: raise ProtocolError("없는 게임입니다")
+        return server_game
+
+    def _take_seats(self, connection, server_game, seats):
+        for player in seats:
+            if player not in server_game.game.players: raise ProtocolError(f"없는 자리: {player}")
+            owner = server_game.seats.get(player)
+            if owner is not None and owner is not connection: raise ProtocolError(f"이미 주인이 있는 자리: {player}")
+        for player in seats:
+            server_game.seats[player] = connection
+        server_game.subscribers.add(connection)
+        connection.games.add(server_game.game_id)
+
+    def op_create(self, connection, request):
+        grid_size = int_field(request, 'grid_size', DEFAULT_GRID_SIZE)
+        # 격자 구조를 만들기 전에 크기부터 확인합니다.
+        if not MIN_GRID_SIZE <= grid_size <= MAX_GRID_SIZE: raise ProtocolError(f"크기 {MIN_GRID_SIZE}~{MAX_GRID_SIZE} 선택")
+        win_type = request.get('win_type', DEFAULT_WINNING_TYPE)
+        game = GameState(grid_size, int_field(request, 'players', DEFAULT_NUM_PLAYERS),
+                         int_field(request, 'win_length', DEFAULT_WINNING_LENGTH),
+                         WIN_TYPE_ALIASES.get(win_type, win_type),
+                         hex_board=self.topology_cache.hex_board(grid_size))
+        server_game = ServerGame(self._next_game_id, game)
+        # seats를 주지 않으면 만든 연결이 모든 자리를 맡습니다. (혼자 또는 한 화면에서 여럿이 둘 때)
+        self._take_seats(connection, server_game, request.get('seats', game.players))
+        self.games[server_game.game_id] = server_game
+        self._next_game_id += 1
+        return {'state': game_state_message(server_game), 'you': connection.name}
+
+    def op_join(self, connection, request):
+        server_game = self._server_game(request)
+        self._take_seats(connection, server_game, request.get('seats', []))
+        return {'state': game_state_message(server_game), 'you': connection.name}
+
+    def op_leave(self, connection, request):
+        self._leave(connection, self._server_game(request))
+        return {}
+
+    def op_state(self, connection, request):
+        return {'state': game_state_message(self._server_game(request))}
+
+    def op_list(self, connection, request):
+        return {'games': [{'game': g.game_id, 'grid_size': g.game.grid_size, 'players': g.game.num_players,
+                           'win_length': g.game.min_win_length, 'win_type': g.game.winning_type,
+                           'active': g.game.game_active, 'open_seats': [p for p in g.game.players if p not in g.seats]}
+                          for g in self.games.values()]}
+
+    def op_play(self, connection, request):
+        server_game = self._server_game(request)
+        game = server_game.game
+        if server_game.seats.get(game.current_player) is not connection: raise ProtocolError("내 차례가 아닙니다")
+        move = request.get('move')
+        if isinstance(move, bool) or not isinstance(move, int): raise ProtocolError("move는 flat index 정수여야 합니다")
+        player = game.current_player
+        game.play(move)  # 잘못된 수는 ValueError -> 오류 응답
+        server_game.pending_moves.append([move, player])
+        self._dirty_games.add(server_game)
+        self._schedule()
+        return {}
+
+    HANDLERS = {
+        'create': op_create,
+        'join': op_join,
+        'leave': op_leave,
+        'state': op_state,
+        'list': op_list,
+        'play': op_play,
+    }
+
+    def _leave(self, connection, server_game):
+        if server_game is None: return
+        server_game.subscribers.discard(connection)
+        for player in [p for p, owner in server_game.seats.items() if owner is connection]:
+            del server_game.seats[player]
+        connection.games.discard(server_game.game_id)
+        if not server_game.subscribers:
+            # 아무도 보고 있지 않은 판은 정리합니다.
+            self.games.pop(server_game.game_id, None)
+            self._dirty_games.discard(server_game)
+
+    # ------------------------------------------------------------------
+    # 일괄 전송
+    # ------------------------------------------------------------------
+    def schedule_flush(self, connection):
+        self._dirty_connections.add(connection)
+        self._schedule()
+
+    def _schedule(self):
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_interval, self._flush)
+
+    def _flush(self):
+        """모아 둔 수를 판마다 update 하나로 묶어 구독자에게 보내고, 연결마다 한 번에 씁니다."""
+        self._flush_handle = None
+        dirty_games, self._dirty_games = self._dirty_games, set()
+        dirty_connections, self._dirty_connections = self._dirty_connections, set()
+        for server_game in dirty_games:
+            game = server_game.game
+            update = {'event': 'update', 'game': server_game.game_id, 'moves': server_game.pending_moves,
+                      'current_player': game.current_player, 'winner': game.winner, 'active': game.game_active}
+            server_game.pending_moves = []
+            for connection in server_game.subscribers:
+                connection.queue(update)
+                dirty_connections.add(connection)
+        for connection in dirty_connections:
+            connection.flush()
+
+
+async def serve(server, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+    if unix_path:
+        listener = await asyncio.start_unix_server(server.handle_client, path=unix_path, limit=MAX_LINE_BYTES)
+    else:
+        listener = await asyncio.start_server(server.handle_client, host, port, limit=MAX_LINE_BYTES)
+    addresses = ', '.join(str(sock.getsockname()) for sock in listener.sockets)
+    print(f"육각형 틱택토 서버 대기 중: {addresses}", file=sys.stderr)
+    async with listener:
+        await listener.serve_forever()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="육각형 틱택토 여러 판 동시 진행 서버")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="TCP 주소")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="TCP 포트")
+    parser.add_argument('--unix', help="TCP 대신 사용할 Unix 소켓 경로")
+    parser.add_argument('--topology-cache-dir', help="인접 정보 디스크 캐시 폴더")
+    parser.add_argument('--batch-interval', type=float, default=BATCH_INTERVAL, help="수 알림을 모아 보내는 주기 (초)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = HexServer(TopologyCache(cache_dir=args.topology_cache_dir), args.batch_interval)
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""선택해서 켜는 성능 계측 (핫 패스별 호출 횟수와 걸린 시간).
+
+환경 변수 HEX_PROFILE=1 또는 명령줄 --profile 로 켭니다. 계측은 모듈을 불러올 때
+instrumented()로 함수에 씌우므로, 꺼져 있으면 원래 함수가 그대로 쓰여 비용이 전혀 없습니다.
+그래서 enable()은 hexengine 등 계측할 모듈을 불러오기 전에 불러야 합니다.
+HEX_PROFILE_FILE 을 주면 일정 주기로 통계를 JSONL 한 줄씩 덧붙입니다.
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+
+PROFILE_ENV = "HEX_PROFILE"
+PROFILE_FILE_ENV = "HEX_PROFILE_FILE"
+PROFILE_FLAG = "--profile"
+DEFAULT_DUMP_INTERVAL = 5.0  # JSONL 기록 주기 (초)
+
+enabled = os.environ.get(PROFILE_ENV, '') not in ('', '0')
+
+
+class Stats:
+    """이름별 호출 횟수, 총 시간, 최대 시간. 여러 스레드에서 기록해도 됩니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}  # 이름 -> [호출 횟수, 총 시간, 최대 시간]
+        self.started = time.time()
+
+    def record(self, name, seconds):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                self._metrics[name] = [1, seconds, seconds]
+            else:
+                metric[0] += 1
+                metric[1] += seconds
+                if seconds > metric[2]: metric[2] = seconds
+
+    def snapshot(self):
+        """{이름: {count, total_ms, mean_ms, max_ms}} (총 시간이 긴 순서)."""
+        with self._lock:
+            items = [(name, list(metric)) for name, metric in self._metrics.items()]
+        items.sort(key=lambda item: item[1][1], reverse=True)
+        return {name: {'count': count,
+                       'total_ms': round(total * 1000, 3),
+                       'mean_ms': round(total * 1000 / count, 4),
+                       'max_ms': round(worst * 1000, 3)}
+                for name, (count, total, worst) in items}
+
+    def take(self):
+        """지금까지의 기록을 꺼내고 비웁니다. (작업 프로세스 -> 주 프로세스로 넘길 때)"""
+        with self._lock:
+            metrics, self._metrics = self._metrics, {}
+        return metrics
+
+    def merge(self, metrics):
+        """take()로 꺼낸 다른 프로세스의 기록을 합칩니다."""
+        with self._lock:
+            for name, (count, total, worst) in metrics.items():
+                metric = self._metrics.setdefault(name, [0, 0.0, 0.0])
+                metric[0] += count
+                metric[1] += total
+                if worst > metric[2]: metric[2] = worst
+
+    def reset(self):
+        with self._lock:
+            self._metrics = {}
+        self.started = time.time()
+
+    def summary_lines(self, limit=None):
+        """화면 표시용 한 줄 요약 목록."""
+        lines = [f"{name}: {m['count']}회 평균 {m['mean_ms']:.2f}ms 최대 {m['max_ms']:.1f}ms"
+                 for name, m in self.snapshot().items()]
+        return lines if limit is None else lines[:limit]
+
+    def dump(self, path):
+        """통계 한 줄을 JSONL 파일에 덧붙입니다."""
+        line = {'time': round(time.time(), 3), 'uptime': round(time.time() - self.started, 3),
+                'pid': os.getpid(), 'metrics': self.snapshot()}
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(line, ensure_ascii=False) + '\n')
+
+
+stats = Stats()  # 프로세스마다 하나
+_dump_stop = None
+
+
+def enable():
+    """계측을 켭니다. 계측할 모듈을 불러오기 전에 불러야 합니다."""
+    global enabled
+    enabled = True
+
+
+def instrumented(name):
+    """함수 호출 시간을 stats에 name으로 기록하는 데코레이터. 꺼져 있으면 함수를 그대로 반환합니다."""
+    def decorate(func):
+        if not enabled: return func
+        record = stats.record
+        perf_counter = time.perf_counter
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+def start_periodic_dump(path=None, interval=DEFAULT_DUMP_INTERVAL):
+    """interval초마다 (그리고 종료할 때) stats를 JSONL로 기록하는 백그라운드 스레드를 시작합니다.
+
+    path가 없으면 HEX_PROFILE_FILE 환경 변수를 쓰고, 그것도 없거나 계측이 꺼져 있으면 아무것도 하지 않습니다.
+    """
+    global _dump_stop
+    path = path or os.environ.get(PROFILE_FILE_ENV)
+    if not enabled or not path or _dump_stop is not None: return False
+    _dump_stop = threading.Event()
+
+    def run(stop):
+        while not stop.wait(interval):
+            stats.dump(path)
+
+    threading.Thread(target=run, args=(_dump_stop,), name="hexstats-dump", daemon=True).start()
+
+    def finish():
+        _dump_stop.set()
+        stats.dump(path)
+    atexit.register(finish)
+    return True
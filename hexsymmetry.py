@@ -0,0 +1,210 @@
+"""게임판 대칭을 이용한 국면 정규화 (치환표, 오프닝 북, 시뮬레이션 중복 제거용).
+
+부분 도형의 정수 격자 꼭짓점에 육각형의 12가지 회전/대칭을 적용해 보고, 부분 도형을
+부분 도형으로 보내면서 승리 타입 인접을 보존하는 것만 칸 순열 표로 남깁니다.
+세 부분으로 나눈 엇갈린 격자는 N >= 3에서 이런 대칭이 항등뿐이므로, 이웃 집합이 똑같은
+칸들(쌍둥이 칸, 예: 모서리 끝 칸)은 서로 바꿔도 같은 국면이라는 점도 함께 사용합니다.
+플레이어 이름은 둘 차례부터 시작하도록 돌려서(순환) 맞춥니다. 순서를 바꾸면 차례가 달라지므로
+임의의 치환은 쓰지 않습니다.
+"""
+from array import array
+
+from hexengine import (
+    TOTAL_PARTS_PER_HEX, HEX_VERTEX_LATTICE_OFFSETS, PART_VERTEX_INDICES, HexBoard, iter_bits,
+)
+
+_tables = {}  # (격자 크기, 승리 타입) -> SymmetryTable
+
+
+def part_lattice_points(rows, cols):
+    """부분 도형별 (중심 + 꼭짓점 3개)의 정수 격자 좌표 목록. (x는 √3/2, y는 1/2 단위)"""
+    parts = []
+    for row in range(rows):
+        for col in range(cols):
+            center_x, center_y = 2 * col + row % 2, 3 * row
+            for part_index in range(TOTAL_PARTS_PER_HEX):
+                parts.append([(center_x + HEX_VERTEX_LATTICE_OFFSETS[v_idx][0], center_y + HEX_VERTEX_LATTICE_OFFSETS[v_idx][1])
+                              for v_idx in PART_VERTEX_INDICES[part_index]])
+    return parts
+
+
+def rotate60(x, y):
+    """정수 격자 좌표를 60도 회전합니다. (격자 점은 x, y의 홀짝이 같아 항상 정수)"""
+    return (x - y) // 2, (3 * x + y) // 2
+
+
+def lattice_transforms():
+    """육각형의 12가지 대칭 (회전 6가지, 각각 위아래 뒤집기 포함) 함수 목록. 첫 번째는 항등."""
+    def make(turns, flip):
+        def transform(x, y):
+            if flip: y = -y
+            for _ in range(turns):
+                x, y = rotate60(x, y)
+            return x, y
+        return transform
+    return [make(turns, flip) for flip in (False, True) for turns in range(6)]
+
+
+def outer_part_indices(rows, cols):
+    """바깥 두 줄 육각형의 부분 도형 번호. 좌표의 최솟값(볼록 껍질의 꼭짓점)은 이 안에 있습니다."""
+    outer_rows = {0, 1, rows - 2, rows - 1}
+    outer_cols = {0, 1, cols - 2, cols - 1}
+    return [(row * cols + col) * TOTAL_PARTS_PER_HEX + part_index
+            for row in range(rows) for col in range(cols) if row in outer_rows or col in outer_cols
+            for part_index in range(TOTAL_PARTS_PER_HEX)]
+
+
+def transform_permutation(parts, transform, index_of=None, outer_parts=None):
+    """transform이 부분 도형 전체를 (평행 이동 후) 자기 자신으로 보내면 칸 순열을, 아니면 None.
+
+    index_of(좌표 집합 -> 칸)와 outer_parts(outer_part_indices)를 주면 여러 변환에서 다시 쓰고,
+    맞지 않는 칸이 나오는 즉시 그만두므로 큰 판에서도 항등이 아닌 변환은 빨리 걸러집니다.
+    """
+    if index_of is None: index_of = {frozenset(points): i for i, points in enumerate(parts)}
+    candidates = parts if outer_parts is None else [parts[i] for i in outer_parts]
+    # 가장 작은 좌표끼리 맞추는 평행 이동을 찾습니다.
+    min_x, min_y = min(point for points in candidates for point in points)
+    moved_x, moved_y = min(transform(x, y) for points in candidates for x, y in points)
+    dx, dy = min_x - moved_x, min_y - moved_y
+    permutation = array('i')
+    for points in parts:
+        moved = []
+        for x, y in points:
+            x, y = transform(x, y)
+            moved.append((x + dx, y + dy))
+        target = index_of.get(frozenset(moved))
+        if target is None: return None
+        permutation.append(target)
+    return permutation
+
+
+def preserves_adjacency(permutation, csr):
+    offsets, neighbors = csr
+    for i in range(len(offsets) - 1):
+        target = permutation[i]
+        mapped = sorted(permutation[neighbors[k]] for k in range(offsets[i], offsets[i + 1]))
+        if mapped != sorted(neighbors[offsets[target]:offsets[target + 1]]): return False
+    return True
+
+
+def twin_classes(csr):
+    """이웃 집합이 같은 칸들의 묶음 목록 (크기 2 이상만). 서로 맞닿은 쌍둥이는 자기 자신을 포함해 비교합니다."""
+    offsets, neighbors = csr
+    groups = {}
+    for i in range(len(offsets) - 1):
+        neighbor_set = neighbors[offsets[i]:offsets[i + 1]].tolist()
+        groups.setdefault((False, tuple(sorted(neighbor_set))), []).append(i)
+        groups.setdefault((True, tuple(sorted(neighbor_set + [i]))), []).append(i)
+    classes = []
+    seen = set()
+    for cells in groups.values():
+        if len(cells) < 2 or seen.intersection(cells): continue
+        seen.update(cells)
+        classes.append(cells)
+    return classes
+
+
+class SymmetryTable:
+    """한 격자 크기와 승리 타입의 대칭 순열 표와 정규화 함수."""
+
+    def __init__(self, hex_board, win_type):
+        csr = hex_board.csr(win_type)
+        parts = part_lattice_points(hex_board.rows, hex_board.cols)
+        self.total_spots = hex_board.total_spots
+        self.permutations = [array('i', range(self.total_spots))]  # 항등
+        index_of = {frozenset(points): i for i, points in enumerate(parts)}
+        outer_parts = outer_part_indices(hex_board.rows, hex_board.cols)
+        for transform in lattice_transforms()[1:]:
+            permutation = transform_permutation(parts, transform, index_of, outer_parts)
+            if permutation is None or permutation in self.permutations: continue
+            if preserves_adjacency(permutation, csr):
+                self.permutations.append(permutation)
+        self.twin_classes = twin_classes(csr)
+        self.twin_class_of = {}
+        for class_index, cells in enumerate(self.twin_classes):
+            for cell in cells:
+                self.twin_class_of[cell] = class_index
+
+    @property
+    def size(self):
+        """국면 하나가 최대 몇 개의 같은 국면과 묶이는지 (칸 대칭 수)."""
+        size = len(self.permutations)
+        for cells in self.twin_classes:
+            for k in range(2, len(cells) + 1):
+                size *= k
+        return size
+
+    def canonical_key(self, player_masks, to_move):
+        """같은 국면끼리 같아지는 해시 가능한 키. player_masks는 플레이어 번호 순서의 비트마스크 목록."""
+        return self.canonicalize(player_masks, to_move)[0]
+
+    def canonicalize(self, player_masks, to_move):
+        """(정규화 키, 원래 칸 -> 정규화 칸 변환)을 반환합니다. 변환은 map_move/unmap_move에 넘깁니다."""
+        # 둘 차례인 플레이어가 맨 앞에 오도록 이름을 돌립니다.
+        relative_masks = list(player_masks[to_move:]) + list(player_masks[:to_move])
+        best = None
+        for permutation in self.permutations:
+            masks = [self._permute(mask, permutation) for mask in relative_masks]
+            masks, swaps = self._sort_twins(masks)
+            key = tuple(masks)
+            if best is None or key < best[0]:
+                best = (key, (permutation, swaps))
+        return best
+
+    def map_move(self, flat_index, transform):
+        """원래 칸 -> 정규화된 국면의 칸."""
+        permutation, swaps = transform
+        flat_index = permutation[flat_index]
+        return swaps.get(flat_index, flat_index)
+
+    def unmap_move(self, flat_index, transform):
+        """정규화된 국면의 칸 -> 원래 칸."""
+        permutation, swaps = transform
+        for source, target in swaps.items():
+            if target == flat_index:
+                flat_index = source
+                break
+        return permutation.index(flat_index)
+
+    def _permute(self, mask, permutation):
+        permuted = 0
+        for flat_index in iter_bits(mask):
+            permuted |= 1 << permutation[flat_index]
+        return permuted
+
+    def _sort_twins(self, masks):
+        """쌍둥이 칸 묶음마다 (플레이어 번호, 빈 칸은 마지막) 순서로 앞 칸부터 다시 채웁니다."""
+        swaps = {}
+        occupied = 0
+        for mask in masks:
+            occupied |= mask
+        touched = {self.twin_class_of[cell] for cell in iter_bits(occupied) if cell in self.twin_class_of}
+        if not touched: return masks, swaps
+        masks = list(masks)
+        empty_label = len(masks)
+        for class_index in touched:
+            cells = self.twin_classes[class_index]
+            labels = []
+            for cell in cells:
+                label = next((player for player, mask in enumerate(masks) if mask >> cell & 1), empty_label)
+                labels.append((label, cell))
+                if label != empty_label: masks[label] &= ~(1 << cell)
+            for target, (label, source) in zip(cells, sorted(labels)):
+                if label != empty_label: masks[label] |= 1 << target
+                if source != target: swaps[source] = target
+        return masks, swaps
+
+
+def symmetry_table(grid_size, win_type, hex_board=None):
+    """(격자 크기, 승리 타입)별로 한 번만 만드는 대칭 표."""
+    key = (grid_size, win_type)
+    if key not in _tables:
+        _tables[key] = SymmetryTable(hex_board if hex_board is not None else HexBoard(grid_size), win_type)
+    return _tables[key]
+
+
+def canonical_key(game):
+    """game(GameState)의 현재 국면 정규화 키."""
+    table = symmetry_table(game.grid_size, game.winning_type, game.hex_board)
+    return table.canonical_key([game.player_masks[p] for p in game.players], game.current_player_index)
+
@@ -0,0 +1,211 @@
+"""컴퓨터 플레이어끼리 여러 판을 화면 없이 두는 자체 대국 도구.
+
+예) python selfplay.py --games 1000 --grid-size 3 --players 4 --win-length 3 --win-type edge \
+        --bots greedy,random --workers 8 --output results.jsonl
+
+한 판마다 결과(승자, 수 개수 등)를 JSONL 또는 CSV로 바로 기록하고,
+끝나면 초당 대국 수, 무승부 비율, 자리별 승률(선공 이점)을 출력합니다.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import hexstats
+if hexstats.PROFILE_FLAG in sys.argv: hexstats.enable()  # 계측할 모듈을 불러오기 전에 켜야 함
+from hexengine import (
+    DEFAULT_GRID_SIZE, DEFAULT_NUM_PLAYERS, DEFAULT_WINNING_LENGTH, DEFAULT_PLAYERS,
+    WINNING_TYPE_OPTIONS, WIN_TYPE_ALIASES, GameState,
+)
+from hexai import RandomPlayer, GreedyPlayer, AlphaBetaPlayer
+from hexmcts import MCTSPlayer
+from topocache import TopologyCache
+from hexbook import OpeningBook
+
+BOT_TYPES = ['random', 'greedy', 'alphabeta', 'mcts']
+DEFAULT_BOT_TIME_LIMIT = 0.05  # 탐색형 봇의 한 수당 시간 (초)
+DEFAULT_MCTS_SIMULATIONS = 200
+PROGRESS_INTERVAL = 5.0  # 진행 상황 출력 주기 (초)
+CSV_FIELDS = ['game', 'seed', 'grid_size', 'players', 'win_length', 'win_type', 'bots',
+              'winner', 'moves', 'first_player_won', 'seconds']
+
+_topology_cache = TopologyCache()  # 작업 프로세스마다 하나
+_book = None  # 탐색형 봇이 쓰는 오프닝 북 (작업 프로세스마다 하나)
+
+
+def _init_worker(topology_cache_dir, book_path=None):
+    global _topology_cache, _book
+    _topology_cache = TopologyCache(cache_dir=topology_cache_dir)
+    _book = OpeningBook.load(book_path) if book_path else None
+
+
+def make_bot(bot_type, seed, time_limit=DEFAULT_BOT_TIME_LIMIT, simulations=DEFAULT_MCTS_SIMULATIONS, book=None):
+    if bot_type == 'random': return RandomPlayer(seed)
+    if bot_type == 'greedy': return GreedyPlayer(seed)
+    if bot_type == 'alphabeta': return AlphaBetaPlayer(time_limit=time_limit, seed=seed, book=book)
+    if bot_type == 'mcts': return MCTSPlayer(simulations=simulations, time_limit=time_limit, seed=seed, book=book)
+    raise ValueError(f"알 수 없는 봇 종류: {bot_type}")
+
+
+def play_game(spec):
+    """한 판을 끝까지 두고 결과 dict를 반환합니다. (작업 프로세스에서 실행)"""
+    game_index, seed, grid_size, num_players, min_win_length, winning_type, bot_types, time_limit, simulations = spec
+    started = time.perf_counter()
+    game = GameState(grid_size, num_players, min_win_length, winning_type,
+                     hex_board=_topology_cache.hex_board(grid_size))
+    bots = [make_bot(bot_type, seed * len(DEFAULT_PLAYERS) + i, time_limit, simulations, _book)
+            for i, bot_type in enumerate(bot_types)]
+    moves = 0
+    while game.game_active:
+        game.play(bots[game.current_player_index].choose_move(game))
+        moves += 1
+    result = {
+        'game': game_index,
+        'seed': seed,
+        'grid_size': grid_size,
+        'players': num_players,
+        'win_length': min_win_length,
+        'win_type': winning_type,
+        'bots': ','.join(bot_types),
+        'winner': game.winner,
+        'moves': moves,
+        'first_player_won': game.winner == game.players[0],
+        'seconds': round(time.perf_counter() - started, 6),
+    }
+    if hexstats.enabled:
+        result['profile'] = hexstats.stats.take()  # 주 프로세스에서 합침
+    return result
+
+
+class ResultWriter:
+    """결과를 한 줄씩 바로 기록합니다. (.csv면 CSV, 그 밖에는 JSONL)"""
+
+    def __init__(self, stream, output_format):
+        self.stream = stream
+        self.output_format = output_format
+        if output_format == 'csv':
+            self._csv = csv.DictWriter(stream, fieldnames=CSV_FIELDS)
+            self._csv.writeheader()
+
+    def write(self, result):
+        if self.output_format == 'csv':
+            self._csv.writerow(result)
+        else:
+            self.stream.write(json.dumps(result, ensure_ascii=False) + '\n')
+
+
+class Summary:
+    """전체 대국 통계 (무승부 비율, 자리별 승률, 평균 수 개수, 초당 대국 수)."""
+
+    def __init__(self, num_players):
+        self.num_players = num_players
+        self.games = 0
+        self.draws = 0
+        self.total_moves = 0
+        self.wins = {p: 0 for p in DEFAULT_PLAYERS[:num_players]}
+        self.started = time.perf_counter()
+
+    def add(self, result):
+        self.games += 1
+        self.total_moves += result['moves']
+        if result['winner'] is None: self.draws += 1
+        else: self.wins[result['winner']] += 1
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        games = max(self.games, 1)
+        return {
+            'games': self.games,
+            'seconds': round(elapsed, 3),
+            'games_per_second': round(self.games / elapsed, 2) if elapsed > 0 else None,
+            'draw_rate': round(self.draws / games, 4),
+            'average_moves': round(self.total_moves / games, 2),
+            'win_rates': {p: round(w / games, 4) for p, w in self.wins.items()},
+            # 선공 이점: P1 승률 - 공평한 몫(1/인원)
+            'first_mover_advantage': round(self.wins['P1'] / games - 1 / self.num_players, 4),
+        }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="육각형 틱택토 자체 대국 (화면 없이 여러 판 실행)")
+    parser.add_argument('--games', type=int, default=100, help="대국 수")
+    parser.add_argument('--grid-size', type=int, default=DEFAULT_GRID_SIZE, help="격자 크기 N (NxN)")
+    parser.add_argument('--players', type=int, default=DEFAULT_NUM_PLAYERS, help="참여 인원 (2~4)")
+    parser.add_argument('--win-length', type=int, default=DEFAULT_WINNING_LENGTH, help="승리 연결 개수")
+    parser.add_argument('--win-type', default='any',
+                        help="승리 조건: any/edge/vertex 또는 " + '/'.join(WINNING_TYPE_OPTIONS))
+    parser.add_argument('--bots', default='random',
+                        help="자리별 봇 종류 (쉼표로 구분, 하나면 모든 자리): " + '/'.join(BOT_TYPES))
+    parser.add_argument('--time-limit', type=float, default=DEFAULT_BOT_TIME_LIMIT, help="탐색형 봇의 한 수당 시간 (초)")
+    parser.add_argument('--simulations', type=int, default=DEFAULT_MCTS_SIMULATIONS, help="mcts 봇의 수당 시뮬레이션 수")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="작업 프로세스 수")
+    parser.add_argument('--seed', type=int, default=0, help="첫 대국의 난수 시드 (판마다 1씩 증가)")
+    parser.add_argument('--output', default='-', help="결과 파일 (.jsonl 또는 .csv, '-'는 표준 출력)")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], help="결과 형식 (기본: 파일 확장자로 결정)")
+    parser.add_argument('--topology-cache-dir', help="인접 정보 디스크 캐시 폴더 (작업 프로세스 간 공유)")
+    parser.add_argument(hexstats.PROFILE_FLAG, action='store_true',
+                        help=f"핫 패스 계측을 켜고 끝날 때 요약 출력 ({hexstats.PROFILE_FILE_ENV}가 있으면 JSONL로도 기록)")
+    parser.add_argument('--book', help="탐색형 봇이 먼저 찾아볼 오프닝 북 파일 (hexbook.py로 생성)")
+    args = parser.parse_args(argv)
+
+    args.win_type = WIN_TYPE_ALIASES.get(args.win_type, args.win_type)
+    if args.win_type not in WINNING_TYPE_OPTIONS: parser.error("잘못된 승리 타입")
+    args.bots = [b.strip() for b in args.bots.split(',')]
+    if len(args.bots) == 1: args.bots = args.bots * args.players
+    if len(args.bots) != args.players: parser.error("봇 종류 수가 참여 인원과 다릅니다")
+    for bot_type in args.bots:
+        if bot_type not in BOT_TYPES: parser.error(f"알 수 없는 봇 종류: {bot_type}")
+    if args.games < 1 or args.workers < 1: parser.error("대국 수와 작업 프로세스 수는 1 이상")
+    if args.format is None:
+        args.format = 'csv' if args.output.endswith('.csv') else 'jsonl'
+    try:
+        GameState(args.grid_size, args.players, args.win_length, args.win_type)  # 설정 검증
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    specs = [(i, args.seed + i, args.grid_size, args.players, args.win_length, args.win_type,
+              args.bots, args.time_limit, args.simulations) for i in range(args.games)]
+
+    stream = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+    writer = ResultWriter(stream, args.format)
+    summary = Summary(args.players)
+    last_progress = time.perf_counter()
+    try:
+        if args.workers == 1:
+            _init_worker(args.topology_cache_dir, args.book)
+            results = map(play_game, specs)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                           initargs=(args.topology_cache_dir, args.book))
+            results = executor.map(play_game, specs, chunksize=max(1, args.games // (args.workers * 8)))
+        hexstats.start_periodic_dump()
+        for result in results:
+            if 'profile' in result:
+                hexstats.stats.merge(result.pop('profile'))
+            writer.write(result)
+            summary.add(result)
+            if time.perf_counter() - last_progress >= PROGRESS_INTERVAL:
+                last_progress = time.perf_counter()
+                print(f"{summary.games}/{args.games} 판, {summary.report()['games_per_second']} 판/초", file=sys.stderr)
+        if executor is not None:
+            executor.shutdown()
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+    print(json.dumps(summary.report(), ensure_ascii=False), file=sys.stderr)
+    if hexstats.enabled:
+        print(json.dumps({'profile': hexstats.stats.snapshot()}, ensure_ascii=False), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,38 @@
 import tkinter as tk
-import math
-import collections
+import queue
+import sys
+import threading
 from tkinter import messagebox, ttk
 
+import hexstats
+if hexstats.PROFILE_FLAG in sys.argv: hexstats.enable()  # 계측할 모듈을 불러오기 전에 켜야 함
+from hexengine import (
+    DEFAULT_NUM_PLAYERS, DEFAULT_GRID_SIZE, DEFAULT_WINNING_LENGTH,
+    WINNING_TYPE_OPTIONS,
+    DEFAULT_WINNING_TYPE, DEFAULT_PLAYERS, MIN_GRID_SIZE, MAX_GRID_SIZE, EMPTY, GameState,
+)
+from topocache import TopologyCache
+from hexai import AlphaBetaPlayer
+from hexbook import load_default_book
+from hexclient import ServerConnection
+from hexrender import HexRenderer, UNIT_HEX_VERTICES, EMPTY_FILL, hex_center
+
 # ----------------------------------------------------------------------
-# 게임 설정 상수 (전역 범위)
+# 화면 설정 상수 (전역 범위)
 # ----------------------------------------------------------------------
-HEX_SIZE = 40
-TOTAL_PARTS_PER_HEX = 3
-DEFAULT_NUM_PLAYERS = 4
-DEFAULT_GRID_SIZE = 3
-DEFAULT_WINNING_LENGTH = 3
+HEX_SIZE = 40  # 기본 육각형 크기 (확대/축소 전)
+MIN_HEX_SIZE = 10  # 가장 작게 축소했을 때 (보이는 아이템 수의 상한을 정함)
+MAX_HEX_SIZE = 80
+ZOOM_STEP = 1.25
+VIEW_MAX_WIDTH = 700  # 캔버스가 화면에서 차지하는 최대 크기 (넘으면 스크롤)
+VIEW_MAX_HEIGHT = 440
 MIN_SETTINGS_WIDTH = 750
-WINNING_TYPE_ANY_VERTEX = "일반 모드"
-WINNING_TYPE_EDGE_ONLY = "면 모드"
-WINNING_TYPE_VERTEX_ONLY = "꼭짓점 모드"
-WINNING_TYPE_OPTIONS = [WINNING_TYPE_ANY_VERTEX, WINNING_TYPE_EDGE_ONLY, WINNING_TYPE_VERTEX_ONLY]
-DEFAULT_WINNING_TYPE = WINNING_TYPE_ANY_VERTEX
 DEFAULT_PLAYER_COLORS = {'P1': 'blue', 'P2': 'red', 'P3': 'green', 'P4': 'purple'}
-DEFAULT_PLAYERS = ['P1', 'P2', 'P3', 'P4']
+AI_TIME_LIMIT = 1.0  # AI 한 수당 탐색 시간 (초)
+AI_POLL_INTERVAL_MS = 30  # AI 작업 스레드 결과를 확인하는 주기
+PROFILE_OVERLAY_INTERVAL_MS = 500  # 계측 통계 표시 갱신 주기
+PROFILE_OVERLAY_LINES = 6
+SERVER_POLL_INTERVAL_MS = 30  # 서버 메시지를 확인하는 주기
 
 # 캔버스 여백 (Canvas Padding) 상수를 여기에 정의합니다.
 CANVAS_PADDING = HEX_SIZE  # 캔버스 여백 (육각형 크기만큼 충분히 줌) <--- 여기!
@@ -26,64 +40,54 @@ CANVAS_PADDING = HEX_SIZE  # 캔버스 여백 (육각형 크기만큼 충분히
 # ----------------------------------------------------------------------
 # 게임 상태 전역 변수 (초기화 함수에서 관리)
 # ----------------------------------------------------------------------
-GRID_SIZE_N = DEFAULT_GRID_SIZE
-GRID_ROWS = GRID_SIZE_N
-GRID_COLS = GRID_SIZE_N
-TOTAL_SPOTS = GRID_ROWS * GRID_COLS * TOTAL_PARTS_PER_HEX
+GRID_ROWS = DEFAULT_GRID_SIZE
+GRID_COLS = DEFAULT_GRID_SIZE
 CANVAS_WIDTH = 0
 CANVAS_HEIGHT = 0
 START_OFFSET_X = 0
 START_OFFSET_Y = 0
-board = []
-players = []
+hex_size = HEX_SIZE  # 현재 확대 배율의 육각형 크기
+game = None  # 현재 게임 상태 (hexengine.GameState)
 player_colors = {}
-num_players = 0
-min_win_length = DEFAULT_WINNING_LENGTH
-winning_type = DEFAULT_WINNING_TYPE
-game_active = False
-adjacency_list = []
-vertex_to_parts_map = {}
-item_to_board_index = {}
-board_index_to_item = {}
+renderer = None  # 캔버스의 부분 도형 아이템 관리 (hexrender.HexRenderer)
 available_moves_text_id = None
+profile_text_id = None  # 계측 통계 표시 (--profile 또는 HEX_PROFILE=1 일 때만)
 edit_mode_var = None
 ai_thinking = False  # AI가 계산 중인지 여부
-first_move = True  # 첫 번째 수 여부 확인
-
-# ----------------------------------------------------------------------
-# 헬퍼 함수 (좌표 변환, 거리 계산 등)
-# ----------------------------------------------------------------------
-def flat_to_coords(flat_index):
-    if not 0 <= flat_index < TOTAL_SPOTS: return -1, -1, -1
-    hex_index = flat_index // TOTAL_PARTS_PER_HEX
-    part_index = flat_index % TOTAL_PARTS_PER_HEX
-    row = hex_index // GRID_COLS
-    col = hex_index % GRID_COLS
-    return row, col, part_index
-
-def coords_to_flat(row, col, part_index):
-    if not (0 <= row < GRID_ROWS and 0 <= col < GRID_COLS and 0 <= part_index < TOTAL_PARTS_PER_HEX): return -1
-    hex_index = row * GRID_COLS + col
-    flat_index = hex_index * TOTAL_PARTS_PER_HEX + part_index
-    return flat_index
+ai_seats = set()  # 이번 게임에서 AI가 두는 자리 (예: {'P2', 'P4'})
+ai_player = AlphaBetaPlayer(time_limit=AI_TIME_LIMIT, book=load_default_book())  # 책에 있는 초반 국면은 바로 둠
+ai_results = queue.Queue()  # AI 작업 스레드 -> Tk 메인 스레드 (게임, 취소 이벤트, 수, 오류)
+ai_search_lock = threading.Lock()  # ai_player는 한 번에 한 스레드만 사용
+ai_cancel_event = None
+ai_poll_after_id = None
+topology_cache = TopologyCache()  # 같은 설정으로 다시 시작할 때 인접 리스트 재사용
+server = None  # --connect 로 접속한 서버 (hexclient.ServerConnection). 있으면 화면만 담당
+server_game_id = None  # 서버에서 보고 있는 판 번호
+server_seats = set()  # 서버에서 이 화면이 맡은 자리
+
+def command_line_option(name):
+    """명령줄의 '--이름 값'에서 값을 찾습니다. 없으면 None."""
+    if name in sys.argv[:-1]: return sys.argv[sys.argv.index(name) + 1]
+    return None
 
 # ----------------------------------------------------------------------
 # 캔버스 크기 및 게임판 시작 위치 계산 함수
 # ----------------------------------------------------------------------
 def calculate_canvas_geometry():
+    """게임판 전체 크기 (스크롤 영역)와 시작 위치. 캔버스 창 크기는 VIEW_MAX_* 까지만 커집니다."""
     global CANVAS_WIDTH, CANVAS_HEIGHT, START_OFFSET_X, START_OFFSET_Y
     min_x_rel, max_x_rel = float('inf'), float('-inf')
     min_y_rel, max_y_rel = float('inf'), float('-inf')
 
-    HEX_VERTEX_ANGLES_RAD = [math.radians(a) for a in [90, 30, -30, -90, -150, 150]]
-    for r_idx in range(GRID_ROWS):
-        for c_idx in range(GRID_COLS):
-            q = c_idx - math.floor(r_idx / 2)
-            cx_rel = HEX_SIZE * math.sqrt(3) * (q + r_idx / 2.0)
-            cy_rel = HEX_SIZE * (3.0 / 2.0) * r_idx
-            for angle in HEX_VERTEX_ANGLES_RAD:
-                vx_rel = cx_rel + HEX_SIZE * math.cos(angle)
-                vy_rel = cy_rel + HEX_SIZE * math.sin(angle)
+    # 경계는 바깥쪽 행/열의 육각형이 정하므로 첫 두 행과 마지막 행, 첫 열과 마지막 열만 봅니다.
+    edge_rows = sorted({0, min(1, GRID_ROWS - 1), GRID_ROWS - 1})
+    edge_cols = sorted({0, GRID_COLS - 1})
+    for r_idx in edge_rows:
+        for c_idx in edge_cols:
+            cx_rel, cy_rel = hex_center(r_idx, c_idx, hex_size)
+            for ux, uy in UNIT_HEX_VERTICES:
+                vx_rel = cx_rel + hex_size * ux
+                vy_rel = cy_rel + hex_size * uy
                 min_x_rel = min(min_x_rel, vx_rel)
                 max_x_rel = max(max_x_rel, vx_rel)
                 min_y_rel = min(min_y_rel, vy_rel)
@@ -96,232 +100,137 @@ def calculate_canvas_geometry():
     START_OFFSET_X = CANVAS_PADDING - min_x_rel
     START_OFFSET_Y = CANVAS_PADDING - min_y_rel
 
-# ----------------------------------------------------------------------
-# 인접 리스트 계산 함수
-# ----------------------------------------------------------------------
-def build_adjacency_list(win_type, vertex_to_parts_map):
-    adj_list = [[] for _ in range(TOTAL_SPOTS)]
-    parts_to_vertex_map = {}
-    ROUND_PRECISION = 2
-
-    for vtx, f_list in vertex_to_parts_map.items():
-        for f_idx in f_list:
-            if f_idx not in parts_to_vertex_map:
-                parts_to_vertex_map[f_idx] = set()
-            parts_to_vertex_map[f_idx].add(vtx)
-
-    for flat_index1 in range(TOTAL_SPOTS):
-        if flat_index1 not in parts_to_vertex_map: continue
-        vertices_of_p1 = parts_to_vertex_map[flat_index1]
-
-        for flat_index2 in range(flat_index1 + 1, TOTAL_SPOTS):
-            if flat_index2 not in parts_to_vertex_map: continue
-            vertices_of_p2 = parts_to_vertex_map[flat_index2]
-            shared_vertices = vertices_of_p1.intersection(vertices_of_p2)
-            shared_vertices_count = len(shared_vertices)
-
-            if win_type == WINNING_TYPE_ANY_VERTEX:
-                if shared_vertices_count >= 1:
-                    adj_list[flat_index1].append(flat_index2)
-                    adj_list[flat_index2].append(flat_index1)
-            elif win_type == WINNING_TYPE_EDGE_ONLY:
-                if shared_vertices_count >= 2:
-                    adj_list[flat_index1].append(flat_index2)
-                    adj_list[flat_index2].append(flat_index1)
-            elif win_type == WINNING_TYPE_VERTEX_ONLY:
-                if shared_vertices_count == 1:
-                    adj_list[flat_index1].append(flat_index2)
-                    adj_list[flat_index2].append(flat_index1)
-
-    return adj_list
-
-def build_vertex_to_parts_map():
-    vertex_to_parts_map = {}
-    ROUND_PRECISION = 2
-    hex_perimeter_vertices_rel_unit = [(math.cos(math.radians(a)), math.sin(math.radians(a))) for a in [90, 30, -30, -90, -150, 150]]
-    all_vertices_rel_unit = hex_perimeter_vertices_rel_unit + [(0, 0)]
-    part_vertex_indices = {0: [6, 0, 1, 2], 1: [6, 2, 3, 4], 2: [6, 4, 5, 0]}
-
-    for row in range(GRID_ROWS):
-        for col in range(GRID_COLS):
-            q = col - math.floor(row / 2)
-            r = row
-            cx = START_OFFSET_X + HEX_SIZE * math.sqrt(3) * (q + r / 2.0)
-            cy = START_OFFSET_Y + HEX_SIZE * (3.0 / 2.0) * r
-
-            abs_vertices_this_hex = [(cx + HEX_SIZE * vx, cy + HEX_SIZE * vy) for vx, vy in all_vertices_rel_unit]
-
-            for part_index in range(TOTAL_PARTS_PER_HEX):
-                flat_index = coords_to_flat(row, col, part_index)
-                if flat_index == -1: continue
-
-                vertices_for_part_abs = [abs_vertices_this_hex[v_idx] for v_idx in part_vertex_indices[part_index]]
-                for vx, vy in vertices_for_part_abs:
-                    rounded_vertex = (round(vx, ROUND_PRECISION), round(vy, ROUND_PRECISION))
-                    if rounded_vertex not in vertex_to_parts_map:
-                        vertex_to_parts_map[rounded_vertex] = []
-                    if flat_index not in vertex_to_parts_map[rounded_vertex]:
-                        vertex_to_parts_map[rounded_vertex].append(flat_index)
-    return vertex_to_parts_map
+def configure_canvas_size():
+    canvas.config(width=min(CANVAS_WIDTH, VIEW_MAX_WIDTH), height=min(CANVAS_HEIGHT, VIEW_MAX_HEIGHT),
+                  scrollregion=(0, 0, CANVAS_WIDTH, CANVAS_HEIGHT))
 
 # ----------------------------------------------------------------------
-# 승리 조건 확인, 무승부 확인, 가능한 수 계산 함수
-def check_win_adjacency(board, adjacency_list, min_win_length, last_move_flat_index):
-    player_mark = board[last_move_flat_index]
-    if player_mark == ' ': return None
-
-    visited = set()
-    queue = collections.deque([last_move_flat_index])
-    visited.add(last_move_flat_index)
-    count = 0
-
-    while queue:
-        current_flat_index = queue.popleft()
-        count += 1
-        if current_flat_index < 0 or current_flat_index >= len(adjacency_list): continue
-        for neighbor_flat_index in adjacency_list[current_flat_index]:
-            if 0 <= neighbor_flat_index < TOTAL_SPOTS and board[neighbor_flat_index] == player_mark and neighbor_flat_index not in visited:
-                visited.add(neighbor_flat_index)
-                queue.append(neighbor_flat_index)
-
-    return player_mark if count >= min_win_length else None
-
-def check_draw(board):
-    return ' ' not in board
-
-def calculate_available_moves(board):
-    """현재 보드 상태에서 놓을 수 있는 칸의 수를 계산합니다."""
-    return board.count(' ')
-
-def draw_hexagon_parts(canvas, cx, cy, size, hex_row, hex_col):
-    """육각형을 3개의 클릭 가능한 부분 도형으로 나누어 그립니다."""
-    # 육각형 꼭지점 계산 (pointy top 기준)
-    angles_rad = [math.radians(a) for a in [90, 30, -30, -90, -150, 150]]
-    vertices = [(cx + size * math.cos(angle), cy + size * math.sin(angle)) for angle in angles_rad]
-    parts_vertices = [[(cx, cy), vertices[0], vertices[1], vertices[2]],
-                      [(cx, cy), vertices[2], vertices[3], vertices[4]],
-                      [(cx, cy), vertices[4], vertices[5], vertices[0]]]
-
-    # 각 부분 도형 그리기
-    for part_index in range(TOTAL_PARTS_PER_HEX):
-        # 이 부분 도형에 해당하는 게임 보드의 flat index 계산
-        flat_index = coords_to_flat(hex_row, hex_col, part_index)
-        if flat_index == -1: continue
-
-        # 초기 색상 설정
-        fill_color = "lightgray"
-
-        # Canvas에 polygon 아이템 생성
-        poly_id = canvas.create_polygon(parts_vertices[part_index],
-                                        outline="black", fill=fill_color, width=1, tags="hex_part")  # 태그 추가
-
-        # 아이템 ID와 보드 인덱스 매핑 저장
-        item_to_board_index[poly_id] = flat_index
-        board_index_to_item[poly_id] = flat_index
-
-def draw_hexagon_grid(canvas):
-    """9개의 육각형 셀을 3x3 격자 형태로 배치하고 각 셀의 부분을 그립니다."""
-    for row in range(GRID_ROWS):
-        for col in range(GRID_COLS):
-            # 해당 (row, col)에 해당하는 육각형 중심 좌표 계산 (staggered layout)
-            q = col - math.floor(row / 2)
-            r = row
-
-            cx = START_OFFSET_X + HEX_SIZE * math.sqrt(3) * (q + r / 2.0)
-            cy = START_OFFSET_Y + HEX_SIZE * (3.0 / 2.0) * r
-
-            # 육각형 셀을 3개의 부분으로 나누어 그립니다.
-            draw_hexagon_parts(canvas, cx, cy, HEX_SIZE, row, col)
+# 스크롤 / 확대·축소 (보이는 영역의 육각형만 캔버스 아이템으로 만듦)
+# ----------------------------------------------------------------------
+def update_viewport(event=None):
+    """보이는 영역에 맞춰 부분 도형 아이템을 만들거나 지우고, 표시 글자를 영역 왼쪽 위로 옮깁니다."""
+    x0, y0 = canvas.canvasx(0), canvas.canvasy(0)
+    view_width = max(canvas.winfo_width(), int(canvas.cget('width')))
+    view_height = max(canvas.winfo_height(), int(canvas.cget('height')))
+    renderer.show_region(x0, y0, x0 + view_width, y0 + view_height)
+    if available_moves_text_id is not None: canvas.coords(available_moves_text_id, x0 + 10, y0 + 10)
+    if profile_text_id is not None: canvas.coords(profile_text_id, x0 + 10, y0 + 30)
+
+def scroll_x(*args):
+    canvas.xview(*args)
+    update_viewport()
+
+def scroll_y(*args):
+    canvas.yview(*args)
+    update_viewport()
+
+def on_mouse_wheel(event):
+    """휠: 세로 스크롤, Shift+휠: 가로 스크롤, Ctrl+휠: 확대/축소."""
+    direction = -1 if event.num == 4 or getattr(event, 'delta', 0) > 0 else 1
+    if event.state & 0x0004:
+        zoom(ZOOM_STEP if direction < 0 else 1 / ZOOM_STEP)
+        return
+    if event.state & 0x0001:
+        canvas.xview_scroll(direction, "units")
+    else:
+        canvas.yview_scroll(direction, "units")
+    update_viewport()
+
+def zoom(factor):
+    """육각형 크기를 바꿉니다. 보던 영역의 가운데가 그대로 보이도록 스크롤 위치를 맞춥니다."""
+    global hex_size
+    new_size = max(MIN_HEX_SIZE, min(MAX_HEX_SIZE, round(hex_size * factor)))
+    if game is None or new_size == hex_size: return
+    view_width, view_height = int(canvas.cget('width')), int(canvas.cget('height'))
+    center_x = (canvas.canvasx(0) + view_width / 2) / CANVAS_WIDTH
+    center_y = (canvas.canvasy(0) + view_height / 2) / CANVAS_HEIGHT
+
+    hex_size = new_size
+    calculate_canvas_geometry()
+    configure_canvas_size()
+    renderer.rescale(hex_size, START_OFFSET_X, START_OFFSET_Y)
+    view_width, view_height = int(canvas.cget('width')), int(canvas.cget('height'))
+    canvas.xview_moveto(max(0.0, center_x - view_width / 2 / CANVAS_WIDTH))
+    canvas.yview_moveto(max(0.0, center_y - view_height / 2 / CANVAS_HEIGHT))
+    update_viewport()
 
 # ----------------------------------------------------------------------
 # 게임 로직 및 UI 이벤트 처리
 # ----------------------------------------------------------------------
 def startGame():
-    global GRID_SIZE_N, GRID_ROWS, GRID_COLS, TOTAL_SPOTS, num_players, players, player_colors, min_win_length, winning_type, board, current_player_index, current_player, game_active, adjacency_list, vertex_to_parts_map, item_to_board_index, board_index_to_item, available_moves_text_id, CANVAS_WIDTH, CANVAS_HEIGHT, START_OFFSET_X, START_OFFSET_Y, edit_mode_var, ai_thinking, first_move
-
-    # 0. 전역 변수 선언 (UnboundLocalError 방지)
-    global game_active, ai_thinking, first_move
+    # 서버에 접속해 있으면 판은 서버가 만들고, 응답이 오면 show_game으로 보여 줍니다.
+    if server is not None:
+        request_server_game()
+        return
 
-    # 1. 설정 값 가져오기 및 검증
+    # 1. 설정 값 가져오기 및 검증 (검증은 GameState에서 수행)
     try:
-        GRID_SIZE_N = int(grid_size_combo.get())
-        if not 2 <= GRID_SIZE_N <= 6: raise ValueError("크기 2~6 선택")
-
-        num_players = int(player_count_combo.get())
-        if not 2 <= num_players <= len(DEFAULT_PLAYERS): raise ValueError("인원 2~4 선택") # 4인 모드
-
-        min_win_length = int(winning_length_combo.get())
-        if not 3 <= min_win_length <= TOTAL_SPOTS: raise ValueError(f"승리 길이는 3~{TOTAL_SPOTS} 사이")
-
-        winning_type = winning_type_combo.get()
-        if winning_type not in WINNING_TYPE_OPTIONS: raise ValueError("잘못된 승리 타입")
-
+        grid_size = int(grid_size_combo.get())
+        new_game = GameState(grid_size=grid_size,
+                             num_players=int(player_count_combo.get()),
+                             min_win_length=int(winning_length_combo.get()),
+                             winning_type=winning_type_combo.get(),
+                             hex_board=topology_cache.hex_board(grid_size))
     except ValueError as e:
         messagebox.showerror("설정 오류", str(e))
         return
+    show_game(new_game, {p for p in new_game.players if ai_seat_vars[p].get()})
 
-    # 2. 게임 보드 크기, 플레이어, UI 관련 변수 초기화 (순서 중요)
-    GRID_ROWS = GRID_SIZE_N
-    GRID_COLS = GRID_SIZE_N
-    TOTAL_SPOTS = GRID_ROWS * GRID_COLS * TOTAL_PARTS_PER_HEX
-    board = [' '] * TOTAL_SPOTS
-    players = DEFAULT_PLAYERS[:] # 4인 모드
-    player_colors = {p: DEFAULT_PLAYER_COLORS.get(p, 'gray') for p in players}
-    item_to_board_index = {}
-    board_index_to_item = {}
-    game_active = True
-    current_player_index = 0
-    current_player = players[current_player_index]
-    ai_thinking = False
-    first_move = True # 첫 번째 수 여부 초기화
+def show_game(new_game, new_ai_seats):
+    """새 게임 상태로 화면을 다시 구성합니다. (로컬 시작, 서버 상태 수신 공통)"""
+    global GRID_ROWS, GRID_COLS, game, player_colors, CANVAS_WIDTH, CANVAS_HEIGHT, START_OFFSET_X, START_OFFSET_Y, ai_seats
 
-    # 3. 캔버스 크기 재계산 및 인접 리스트 생성
+    # 2. 게임 보드 크기, 플레이어, UI 관련 변수 초기화 (순서 중요)
+    cancel_ai_turn()  # 이전 게임의 AI 계산 중단
+    game = new_game
+    GRID_ROWS = game.grid_size
+    GRID_COLS = game.grid_size
+    player_colors = {p: DEFAULT_PLAYER_COLORS.get(p, 'gray') for p in DEFAULT_PLAYERS}
+    ai_seats = new_ai_seats
+
+    # 3. 캔버스 크기 재계산 (판이 보이는 영역보다 크면 스크롤)
     calculate_canvas_geometry()
-    canvas.config(width=CANVAS_WIDTH, height=CANVAS_HEIGHT)
-    vertex_to_parts_map = build_vertex_to_parts_map()
-    adjacency_list = build_adjacency_list(winning_type, vertex_to_parts_map)
+    configure_canvas_size()
 
-    # 4. 캔버스 초기화
-    canvas.delete("all")
-
-    # 5. 게임 격자 UI 그리기
-    draw_hexagon_grid(canvas)
-
-    # 6. 가능한 수 표시 UI 업데이트
-    update_available_moves_text()
+    # 4~5. 게임 격자 UI 그리기 (같은 크기면 기존 도형을 다시 쓰고 색만 초기화)
+    renderer.layout(GRID_ROWS, GRID_COLS, START_OFFSET_X, START_OFFSET_Y)
+    renderer.sync(game.board, player_colors)  # 서버에서 받은 진행 중인 판이면 둔 수를 칠함
+    renderer.flush()
 
-    # 7. 상태 라벨 업데이트
-    status_label.config(text=f"현재 차례: {current_player} ({player_colors[current_player]})")
+    # 6~7. 가능한 수 표시, 상태 라벨 업데이트
+    refresh_game_status()
+    update_viewport()  # 보이는 영역의 육각형 아이템 만들기
 
     # 8. 위젯 상태 설정
     grid_size_combo.config(state="readonly")
     player_count_combo.config(state="readonly")
     winning_length_combo.config(state="readonly")
     winning_type_combo.config(state="readonly")
-    edit_mode_check.config(state="normal")  # 수정 모드 체크 활성화 (4인 모드에서는 사용 가능)
-
+    # 수정 모드 체크 활성화 (4인 모드에서는 사용 가능). 서버 판은 서버 기록이 기준이라 수정 불가
+    if game.game_active: edit_mode_check.config(state="normal" if server is None else "disabled")
 
-def on_canvas_click(event):
-    global current_player_index, current_player, game_active, available_moves_text_id, min_win_length, board, adjacency_list, winning_type
-    global first_move # 첫 번째 수
-
-    if not game_active: return
+    # 9. 첫 차례가 AI면 바로 시작
+    schedule_ai_turn()
 
-    is_edit_mode = edit_mode_var.get()
-    clicked_items = canvas.find_closest(event.x, event.y)
-    if not clicked_items: return
 
-    item_id = clicked_items[0]
+@hexstats.instrumented('click')
+def on_canvas_click(event):
+    if game is None or not game.game_active: return
+    if ai_thinking or game.current_player in ai_seats: return  # AI 차례에는 클릭 무시
+    if server is not None and game.current_player not in server_seats: return  # 다른 화면이 맡은 자리
 
-    if item_id in item_to_board_index:
-        flat_index = item_to_board_index[item_id]
+    is_edit_mode = edit_mode_var.get() and server is None
+    # 클릭 좌표를 육각형 좌표로 바로 변환 (격자 밖이나 빈 공간이면 None)
+    flat_index = renderer.hit_test(canvas.canvasx(event.x), canvas.canvasy(event.y))
+    if flat_index is not None:
 
         # 수정 모드가 켜져 있고, 클릭한 칸이 비어있지 않으면 -> 칸 비우기
-        if is_edit_mode and board[flat_index] != ' ':
+        if is_edit_mode and game.board[flat_index] != EMPTY:
              # 보드 상태 업데이트
-             board[flat_index] = ' '
+             game.clear(flat_index)
              # Canvas 그래픽 업데이트 (기본 색상으로 되돌림)
-             canvas.itemconfig(item_id, fill="lightgray") # 초기 빈 칸 색상
+             renderer.set_fill(flat_index, EMPTY_FILL) # 초기 빈 칸 색상
+             renderer.flush()
 
              # 남은 수 텍스트 업데이트
              update_available_moves_text()
@@ -331,86 +240,240 @@ def on_canvas_click(event):
 
 
         # 수정 모드가 꺼져 있거나 (기존 로직), 수정 모드 중 빈 칸을 클릭했으면 -> 일반 게임 진행
-        if not is_edit_mode and board[flat_index] == ' ':
-            board[flat_index] = current_player
-            canvas.itemconfig(item_id, fill=player_colors[current_player])
-
-            temp_winning_type = winning_type # 임시로 저장
-            if first_move:
-                # 첫 번째 수일 경우, 승리 조건을 '면으로만 인접 승리'로 임시 변경
-                temp_adj_list = build_adjacency_list(WINNING_TYPE_EDGE_ONLY, vertex_to_parts_map)
-            else:
-                # 첫 번째 수가 아니면 원래 승리 타입의 인접 리스트 사용
-                temp_adj_list = adjacency_list
-
-
-            winner = check_win_adjacency(board, temp_adj_list, min_win_length, last_move_flat_index=flat_index)
-
-            # 첫 번째 수 여부 업데이트 및 승리 타입 복원
-            if first_move:
-                first_move = False # 첫 번째 수 끝
-
-            if winner:
-                game_active = False
-                status_label.config(text=f"축하합니다! {winner} 승리! (연결 {min_win_length}, {winning_type})")
-                grid_size_combo.config(state="readonly")
-                player_count_combo.config(state="readonly")
-                winning_length_combo.config(state="readonly")
-                winning_type_combo.config(state="readonly")
-                edit_mode_check.config(state="disabled")
-            elif check_draw(board):  # check_draw 함수에 인자 board 전달
-                game_active = False
-                status_label.config(text="무승부!")
-                grid_size_combo.config(state="readonly")
-                player_count_combo.config(state="readonly")
-                winning_length_combo.config(state="readonly")
-                winning_type_combo.config(state="readonly")
-                edit_mode_check.config(state="disabled")
-            else:
-                next_player()
-            update_available_moves_text()
+        if not is_edit_mode and game.board[flat_index] == EMPTY:
+            apply_move(flat_index)
+
+def apply_move(flat_index):
+    """현재 플레이어의 수를 두고 화면을 갱신합니다. (사람/AI 공통)"""
+    if server is not None:
+        # 서버 판에서는 요청만 보내고, 서버가 알려 주는 update로 보드에 반영합니다.
+        server.request('play', game=server_game_id, move=flat_index)
+        return
+    mover = game.current_player
+    # 첫 번째 수의 '면 모드' 인접 판정은 GameState.play에서 처리
+    game.play(flat_index)
+    renderer.set_fill(flat_index, player_colors[mover])
+    renderer.flush()
+    refresh_game_status()
+    schedule_ai_turn()
+
+def refresh_game_status():
+    """승리/무승부/현재 차례 표시와 남은 수를 갱신합니다."""
+    if game.winner:
+        status_label.config(text=f"축하합니다! {game.winner} 승리! (연결 {game.min_win_length}, {game.winning_type})")
+        end_game_widgets()
+    elif not game.game_active:
+        status_label.config(text="무승부!")
+        end_game_widgets()
+    else:
+        update_status_label()
+        edit_mode_check.config(state="normal" if server is None else "disabled")
+    update_available_moves_text()
+
+def undo_move(event=None):
+    """한 수 되돌리기. AI 자리 차례로 돌아오면 사람 차례가 될 때까지 더 되돌립니다."""
+    if game is None or server is not None: return  # 서버 판은 되돌릴 수 없음
+    cancel_ai_turn()
+    if game.undo() is None: return
+    while game.current_player in ai_seats and len(ai_seats) < game.num_players:
+        if game.undo() is None: break
+    refresh_after_history_change()
+
+def redo_move(event=None):
+    """되돌린 수를 다시 둡니다."""
+    if game is None or ai_thinking or server is not None: return
+    if game.redo() is None: return
+    refresh_after_history_change()
+
+def refresh_after_history_change():
+    # 여러 칸이 한꺼번에 바뀔 수 있으므로 보드와 화면이 다른 칸만 다시 칠합니다.
+    renderer.sync(game.board, player_colors)
+    renderer.flush()
+    refresh_game_status()
+    schedule_ai_turn()
+
+def schedule_ai_turn():
+    """다음 차례가 AI 자리면 작업 스레드에서 AI 수 계산을 시작합니다."""
+    global ai_thinking, ai_cancel_event, ai_poll_after_id
+    if game is None or not game.game_active or game.current_player not in ai_seats: return
+    ai_thinking = True
+    status_label.config(text=f"{game.current_player} (AI) 생각 중...")
+
+    # 작업 스레드에는 복사본을 넘겨 화면 쪽 게임 상태와 공유하지 않습니다.
+    ai_cancel_event = threading.Event()
+    worker = threading.Thread(target=run_ai_search, args=(game, game.copy(), ai_cancel_event), daemon=True)
+    worker.start()
+    ai_poll_after_id = root.after(AI_POLL_INTERVAL_MS, poll_ai_result)
+
+def run_ai_search(scheduled_game, snapshot, cancel_event):
+    """(작업 스레드) AI 수를 계산해 결과 큐에 넣습니다."""
+    with ai_search_lock:
+        try:
+            ai_results.put((scheduled_game, cancel_event, ai_player.choose_move(snapshot, cancel_event), None))
+        except Exception as e:
+            ai_results.put((scheduled_game, cancel_event, None, e))
+
+def poll_ai_result():
+    """(Tk 메인 스레드) AI 결과가 왔으면 수를 두고, 아니면 다시 확인을 예약합니다."""
+    global ai_thinking, ai_cancel_event, ai_poll_after_id
+    ai_poll_after_id = None
+    while True:
+        try:
+            scheduled_game, cancel_event, flat_index, error = ai_results.get_nowait()
+        except queue.Empty:
+            ai_poll_after_id = root.after(AI_POLL_INTERVAL_MS, poll_ai_result)
+            return
+        if cancel_event is ai_cancel_event and scheduled_game is game: break
+        # 취소된 이전 계산의 결과는 버립니다.
+
+    ai_thinking = False
+    ai_cancel_event = None
+    if error is not None:
+        messagebox.showerror("AI 오류", str(error))
+        return
+    apply_move(flat_index)
+
+def cancel_ai_turn():
+    """진행 중인 AI 계산을 취소합니다. (게임 시작/다시 시작 시)"""
+    global ai_thinking, ai_cancel_event, ai_poll_after_id
+    if ai_cancel_event is not None:
+        ai_cancel_event.set()
+        ai_cancel_event = None
+    if ai_poll_after_id is not None:
+        root.after_cancel(ai_poll_after_id)
+        ai_poll_after_id = None
+    ai_thinking = False
+
+# ----------------------------------------------------------------------
+# 서버 판 (--connect): 상태는 서버가 갖고, 이 화면은 요청을 보내고 알림을 그립니다.
+# ----------------------------------------------------------------------
+def request_server_game():
+    """--game 이 있으면 그 판에 참여하고, 없으면 고른 설정으로 서버에 새 판을 만듭니다."""
+    seats = command_line_option('--seat')
+    seat_fields = {} if seats is None else {'seats': [p for p in seats.split(',') if p]}
+    join_game_id = command_line_option('--game')
+    leave_server_game()
+    if join_game_id is not None:
+        server.request('join', game=int(join_game_id), **seat_fields)
+    else:
+        server.request('create', grid_size=int(grid_size_combo.get()), players=int(player_count_combo.get()),
+                       win_length=int(winning_length_combo.get()), win_type=winning_type_combo.get(), **seat_fields)
+    status_label.config(text="서버 응답 기다리는 중...")
+
+def leave_server_game():
+    global server_game_id
+    if server is not None and server_game_id is not None:
+        server.request('leave', game=server_game_id)
+    server_game_id = None
+
+def show_server_state(state, you=None):
+    """서버가 보낸 판 전체 상태로 로컬 GameState를 다시 만들어 보여 줍니다. (기보 재생)"""
+    global server_game_id, server_seats
+    try:
+        new_game = GameState(state['grid_size'], state['players'], state['win_length'], state['win_type'],
+                             hex_board=topology_cache.hex_board(state['grid_size']))
+        for flat_index, _ in state['moves']:
+            new_game.play(flat_index)
+    except ValueError as e:
+        messagebox.showerror("서버 상태 오류", str(e))
+        return
+    server_game_id = state['game']
+    if you is not None: server_seats = {p for p, owner in state['seats'].items() if owner == you}
+    show_game(new_game, {p for p in server_seats if ai_seat_vars[p].get()})
+
+def apply_server_moves(moves):
+    """update 알림의 수를 차례대로 둡니다. 로컬 상태와 어긋나면 전체 상태를 다시 요청합니다."""
+    for flat_index, player in moves:
+        if not game.game_active or game.current_player != player or game.board[flat_index] != EMPTY:
+            server.request('state', game=server_game_id)
+            return
+        game.play(flat_index)
+        renderer.set_fill(flat_index, player_colors[player])
+    renderer.flush()
+    refresh_game_status()
+    schedule_ai_turn()
+
+def poll_server():
+    """(Tk 메인 스레드) 서버에서 온 응답과 알림을 처리하고 다시 확인을 예약합니다."""
+    global server
+    for message in server.poll():
+        if message is None:
+            status_label.config(text="서버 연결이 끊겼습니다")
+            cancel_ai_turn()
+            server = None
+            return
+        if message.get('event') == 'update':
+            if game is not None and message['game'] == server_game_id: apply_server_moves(message['moves'])
+        elif not message.get('ok'):
+            status_label.config(text=f"서버 오류: {message.get('error')}")
+        elif 'state' in message:
+            show_server_state(message['state'], message.get('you'))
+    root.after(SERVER_POLL_INTERVAL_MS, poll_server)
+
+def connect_to_server(address):
+    global server
+    try:
+        server = ServerConnection(address)
+    except (OSError, ValueError) as e:
+        messagebox.showerror("서버 접속 오류", str(e))
+        return
+    root.title(f"육각형 틱택토 - 서버 {address}")
+    undo_button.config(state="disabled")
+    redo_button.config(state="disabled")
+    root.after(SERVER_POLL_INTERVAL_MS, poll_server)
+
+def end_game_widgets():
+    grid_size_combo.config(state="readonly")
+    player_count_combo.config(state="readonly")
+    winning_length_combo.config(state="readonly")
+    winning_type_combo.config(state="readonly")
+    edit_mode_check.config(state="disabled")
 
 def update_available_moves_text():
-    available_moves = calculate_available_moves(board)
+    global available_moves_text_id
+    available_moves = game.available_move_count()
+    if available_moves_text_id is None:
+        available_moves_text_id = canvas.create_text(canvas.canvasx(0) + 10, canvas.canvasy(0) + 10, anchor=tk.NW, font=('Arial', 12))
     canvas.itemconfig(available_moves_text_id, text=f"남은 수: {available_moves}")
 
-def next_player():
-    global current_player_index, current_player
-    current_player_index = (current_player_index + 1) % num_players
-    current_player = players[current_player_index]
+def update_profile_overlay():
+    """남은 수 표시 아래에 핫 패스별 계측 통계를 보여 주고 주기적으로 갱신합니다."""
+    global profile_text_id
+    if profile_text_id is None:
+        profile_text_id = canvas.create_text(canvas.canvasx(0) + 10, canvas.canvasy(0) + 30, anchor=tk.NW, font=('Arial', 9), fill="gray25")
+    canvas.itemconfig(profile_text_id, text="\n".join(hexstats.stats.summary_lines(PROFILE_OVERLAY_LINES)))
+    canvas.tag_raise(profile_text_id)
+    root.after(PROFILE_OVERLAY_INTERVAL_MS, update_profile_overlay)
+
+def update_status_label():
+    current_player = game.current_player
     status_label.config(text=f"현재 차례: {current_player} ({player_colors[current_player]})")
 
 
 def reset_game():
-    global GRID_SIZE_N, GRID_ROWS, GRID_COLS, TOTAL_SPOTS, CANVAS_WIDTH, CANVAS_HEIGHT, START_OFFSET_X, START_OFFSET_Y
-    global board, players, player_colors, num_players, min_win_length, winning_type, game_active, adjacency_list, vertex_to_parts_map
-    global item_to_board_index, board_index_to_item, available_moves_text_id, edit_mode_var, first_move
+    global GRID_ROWS, GRID_COLS, CANVAS_WIDTH, CANVAS_HEIGHT, START_OFFSET_X, START_OFFSET_Y
+    global game, player_colors, available_moves_text_id, profile_text_id, ai_seats, hex_size
 
     # 1. 게임 설정 관련 전역 변수 초기화
-    GRID_SIZE_N = DEFAULT_GRID_SIZE
-    GRID_ROWS = GRID_SIZE_N
-    GRID_COLS = GRID_SIZE_N
-    TOTAL_SPOTS = GRID_ROWS * GRID_COLS * 3
+    GRID_ROWS = DEFAULT_GRID_SIZE
+    GRID_COLS = DEFAULT_GRID_SIZE
+    hex_size = HEX_SIZE
 
     # 2. 게임 내용 관련 전역 변수 초기화
-    board = [' '] * TOTAL_SPOTS
-    players = DEFAULT_PLAYERS[:]
-    player_colors = {p: DEFAULT_PLAYER_COLORS.get(p, 'gray') for p in players} # 색상 초기화 추가
-    num_players = DEFAULT_NUM_PLAYERS
-    min_win_length = DEFAULT_WINNING_LENGTH
-    winning_type = DEFAULT_WINNING_TYPE
-    game_active = False
-    adjacency_list = []
-    vertex_to_parts_map = {}
-    item_to_board_index = {}
-    board_index_to_item = {}
+    game = None
+    player_colors = {p: DEFAULT_PLAYER_COLORS.get(p, 'gray') for p in DEFAULT_PLAYERS} # 색상 초기화 추가
     available_moves_text_id = None
-    edit_mode_var = tk.BooleanVar(value=False)
-    first_move = True # 리셋 시 첫 번째 수
+    profile_text_id = None
+    cancel_ai_turn()
+    ai_seats = set()
+    leave_server_game()
 
     # 3. 캔버스 초기화
     calculate_canvas_geometry()
+    configure_canvas_size()
     canvas.delete("all")
+    renderer.clear()
+    renderer.hex_size = hex_size
 
     # 4. 콤보 박스 및 체크 버튼 초기화
     grid_size_combo.config(state="readonly")
@@ -423,6 +486,8 @@ def reset_game():
     winning_type_combo.set(DEFAULT_WINNING_TYPE)
     edit_mode_check.config(state="normal")  # "수정 모드" 체크 활성화
     edit_mode_var.set(False) # 체크 해제 상태로
+    for ai_seat_var in ai_seat_vars.values():
+        ai_seat_var.set(False)
 
     # 5. 상태 라벨 초기화
     status_label.config(text="설정을 선택하고 게임 시작")
@@ -440,7 +505,7 @@ frame1.pack(side=tk.TOP, fill=tk.X, padx=5, pady=2)
 
 grid_size_label = tk.Label(frame1, text="격자 크기 (NxN):", font=('Arial', 12))
 grid_size_label.pack(side=tk.LEFT, padx=5)
-grid_size_combo = ttk.Combobox(frame1, values=[str(i) for i in range(2, 7)], state="readonly", width=3)
+grid_size_combo = ttk.Combobox(frame1, values=[str(i) for i in range(MIN_GRID_SIZE, MAX_GRID_SIZE + 1)], state="readonly", width=3)
 grid_size_combo.set(str(DEFAULT_GRID_SIZE))
 grid_size_combo.pack(side=tk.LEFT, padx=5)
 
@@ -474,15 +539,48 @@ edit_mode_var = tk.BooleanVar(value=False) # 수정 모드 변수 초기화
 edit_mode_check = tk.Checkbutton(frame3, text="수정 모드", variable=edit_mode_var, font=('Arial', 12))
 edit_mode_check.pack(side=tk.LEFT, padx=5)
 
+ai_seat_label = tk.Label(frame3, text="AI 플레이어:", font=('Arial', 12))
+ai_seat_label.pack(side=tk.LEFT, padx=5)
+ai_seat_vars = {}
+for player in DEFAULT_PLAYERS:
+    ai_seat_vars[player] = tk.BooleanVar(value=False)
+    tk.Checkbutton(frame3, text=player, variable=ai_seat_vars[player], font=('Arial', 12)).pack(side=tk.LEFT)
+
 # 버튼
 start_button = tk.Button(root, text="게임 시작", command=startGame)
 start_button.pack(pady=5)
 
-# 캔버스
+# 되돌리기 / 다시 하기 버튼
+history_frame = tk.Frame(root)
+history_frame.pack(pady=2)
+undo_button = tk.Button(history_frame, text="되돌리기", command=undo_move)
+undo_button.pack(side=tk.LEFT, padx=5)
+redo_button = tk.Button(history_frame, text="다시 하기", command=redo_move)
+redo_button.pack(side=tk.LEFT, padx=5)
+zoom_in_button = tk.Button(history_frame, text="확대 +", command=lambda: zoom(ZOOM_STEP))
+zoom_in_button.pack(side=tk.LEFT, padx=5)
+zoom_out_button = tk.Button(history_frame, text="축소 -", command=lambda: zoom(1 / ZOOM_STEP))
+zoom_out_button.pack(side=tk.LEFT, padx=5)
+root.bind("<Control-z>", undo_move)
+root.bind("<Control-y>", redo_move)
+
+# 캔버스 (큰 판은 스크롤 / 확대·축소)
 calculate_canvas_geometry()
-canvas = tk.Canvas(root, width=CANVAS_WIDTH, height=CANVAS_HEIGHT, bg="white")
-canvas.pack(pady=10)
+canvas_frame = tk.Frame(root)
+canvas_frame.pack(pady=10)
+canvas = tk.Canvas(canvas_frame, width=min(CANVAS_WIDTH, VIEW_MAX_WIDTH), height=min(CANVAS_HEIGHT, VIEW_MAX_HEIGHT),
+                   bg="white", scrollregion=(0, 0, CANVAS_WIDTH, CANVAS_HEIGHT))
+x_scrollbar = tk.Scrollbar(canvas_frame, orient=tk.HORIZONTAL, command=scroll_x)
+y_scrollbar = tk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=scroll_y)
+canvas.config(xscrollcommand=x_scrollbar.set, yscrollcommand=y_scrollbar.set)
+canvas.grid(row=0, column=0)
+y_scrollbar.grid(row=0, column=1, sticky="ns")
+x_scrollbar.grid(row=1, column=0, sticky="ew")
 canvas.bind("<Button-1>", on_canvas_click)
+canvas.bind("<Configure>", update_viewport)
+for wheel_event in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+    canvas.bind(wheel_event, on_mouse_wheel)
+renderer = HexRenderer(canvas, hex_size)
 
 # 상태 라벨
 status_label = tk.Label(root, text=f"게임 시작 전, 설정을 선택하세요.", font=('Arial', 15))
@@ -494,8 +592,13 @@ reset_button.pack(pady=5)
 
 # 초기화 함수 호출 및 메인 루프 실행
 reset_game()
-window_width = max(CANVAS_WIDTH + 40, MIN_SETTINGS_WIDTH)
-window_height = 700
+if command_line_option('--connect') is not None:
+    connect_to_server(command_line_option('--connect'))
+if hexstats.enabled:
+    hexstats.start_periodic_dump()
+    update_profile_overlay()
+window_width = max(VIEW_MAX_WIDTH + 60, MIN_SETTINGS_WIDTH)
+window_height = 740
 root.geometry(f"{window_width}x{window_height}")
 root.resizable(False, False)
 
@@ -0,0 +1,154 @@
+"""격자 크기/승리 타입별 인접 정보(토폴로지) 캐시.
+
+메모리에는 (격자 크기, 승리 타입) 키의 LRU로 보관하고, cache_dir를 주면
+CSR 배열을 바이너리 파일로 저장해 두었다가 mmap으로 읽어 프로세스 간에 공유합니다.
+"""
+import collections
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+
+from hexengine import WINNING_TYPE_OPTIONS, TOTAL_PARTS_PER_HEX, HexBoard, build_adjacency_csr, build_vertex_to_parts_map
+
+DEFAULT_MAX_ENTRIES = 16
+
+# 파일 헤더: 매직, 버전, 바이트 순서('<' 또는 '>'), 정수 크기, 격자 크기, 승리 타입 번호, 부분 도형 수, 이웃 수
+FILE_MAGIC = b'HXTP'
+FILE_VERSION = 1
+HEADER_FORMAT = '<4sBcBxIIII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+NATIVE_BYTE_ORDER = b'<' if sys.byteorder == 'little' else b'>'
+
+
+class TopologyCache:
+    """(격자 크기, 승리 타입) -> CSR (offsets, neighbors) LRU 캐시."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, cache_dir=None):
+        if max_entries < 1: raise ValueError("캐시 크기는 1 이상")
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = collections.OrderedDict()
+        self._boards = collections.OrderedDict()  # 격자 크기 -> HexBoard (게임끼리 공유)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, grid_size, win_type):
+        """CSR 인접 정보를 반환합니다. 메모리 -> 디스크 -> 새로 계산 순서로 찾습니다."""
+        if win_type not in WINNING_TYPE_OPTIONS: raise ValueError("잘못된 승리 타입")
+        key = (grid_size, win_type)
+        with self._lock:
+            csr = self._entries.get(key)
+            if csr is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return csr
+            self.misses += 1
+
+            csr = self._load(grid_size, win_type)
+            if csr is None:
+                # 세 승리 타입은 한 번에 계산되므로 모두 캐시에 넣습니다.
+                total_spots = grid_size * grid_size * TOTAL_PARTS_PER_HEX
+                built = build_adjacency_csr(build_vertex_to_parts_map(grid_size, grid_size), total_spots)
+                for built_type, built_csr in built.items():
+                    self._store(grid_size, built_type, built_csr)
+                    if built_type != win_type:
+                        self._put((grid_size, built_type), built_csr)
+                csr = built[win_type]
+            self._put(key, csr)
+            return csr
+
+    def hex_board(self, grid_size):
+        """인접 정보를 이 캐시에서 가져오는 HexBoard. 같은 격자 크기면 같은 객체를 돌려줍니다."""
+        with self._lock:
+            board = self._boards.get(grid_size)
+            if board is None:
+                board = HexBoard(grid_size, adjacency_source=self.get)
+                self._boards[grid_size] = board
+                while len(self._boards) > self.max_entries:
+                    self._boards.popitem(last=False)
+            else:
+                self._boards.move_to_end(grid_size)
+            return board
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._boards.clear()
+
+    def _put(self, key, csr):
+        self._entries[key] = csr
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # 디스크 저장소
+    # ------------------------------------------------------------------
+    def _path(self, grid_size, win_type):
+        return os.path.join(self.cache_dir, f"topology_{grid_size}_{WINNING_TYPE_OPTIONS.index(win_type)}.bin")
+
+    def _store(self, grid_size, win_type, csr):
+        if self.cache_dir is None: return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # 올바른 파일이 이미 있으면 그대로 두고, 없거나 읽을 수 없는 파일이면 (다시) 씁니다.
+        if self._load(grid_size, win_type) is not None: return
+        write_topology_file(self._path(grid_size, win_type), grid_size, win_type, csr)
+
+    def _load(self, grid_size, win_type):
+        if self.cache_dir is None: return None
+        path = self._path(grid_size, win_type)
+        if not os.path.exists(path): return None
+        try:
+            return read_topology_file(path, grid_size, win_type)
+        except (OSError, ValueError):
+            return None  # 손상되었거나 다른 플랫폼에서 만든 파일은 무시하고 새로 계산
+
+
+def write_topology_file(path, grid_size, win_type, csr):
+    """CSR 배열을 바이너리 파일로 씁니다. (임시 파일에 쓴 뒤 교체해 동시 접근에 안전)"""
+    offsets, neighbors = csr
+    offsets = array('i', offsets)
+    neighbors = array('i', neighbors)
+    header = struct.pack(HEADER_FORMAT, FILE_MAGIC, FILE_VERSION, NATIVE_BYTE_ORDER, offsets.itemsize,
+                         grid_size, WINNING_TYPE_OPTIONS.index(win_type), len(offsets) - 1, len(neighbors))
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            offsets.tofile(f)
+            neighbors.tofile(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_topology_file(path, grid_size, win_type):
+    """바이너리 파일을 mmap으로 열어 복사 없이 (offsets, neighbors) memoryview를 반환합니다."""
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        if len(mm) < HEADER_SIZE: raise ValueError("토폴로지 파일이 너무 짧습니다")
+        magic, version, byte_order, itemsize, file_grid_size, type_index, total_spots, neighbor_count = \
+            struct.unpack_from(HEADER_FORMAT, mm)
+        if magic != FILE_MAGIC or version != FILE_VERSION: raise ValueError("토폴로지 파일 형식이 다릅니다")
+        if byte_order != NATIVE_BYTE_ORDER or itemsize != array('i').itemsize: raise ValueError("플랫폼이 다른 토폴로지 파일")
+        if file_grid_size != grid_size or type_index != WINNING_TYPE_OPTIONS.index(win_type): raise ValueError("설정이 다른 토폴로지 파일")
+        if len(mm) != HEADER_SIZE + itemsize * (total_spots + 1 + neighbor_count): raise ValueError("토폴로지 파일 크기 불일치")
+    except ValueError:
+        mm.close()  # 다시 쓸 수 있도록 바로 닫음
+        raise
+
+    values = memoryview(mm)[HEADER_SIZE:].cast('i')
+    return values[:total_spots + 1], values[total_spots + 1:]